@@ -1,6 +1,7 @@
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
+from core.utils import request_timeout
 
 load_dotenv()
 
@@ -12,6 +13,7 @@ def run(params: dict, context: dict) -> str:
     response = client.chat.completions.create(
         model="gpt-3.5-turbo",
         messages=[{"role": "user", "content": f"Summarize this:\n\n{text}"}],
-        temperature=0.2
+        temperature=0.2,
+        timeout=request_timeout(context, 60)
     )
     return response.choices[0].message.content
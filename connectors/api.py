@@ -1,4 +1,172 @@
-def run(params: dict, context: dict) -> str:
+# connectors/api.py
+
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from core.utils import request_timeout
+
+DEFAULT_TIMEOUT = 10            # seconds, per request
+DEFAULT_MAX_BYTES = 5_000_000   # refuse to buffer more than ~5MB per response
+CHUNK_SIZE = 64 * 1024
+
+HN_API = "https://hacker-news.firebaseio.com/v0"
+HN_MAX_WORKERS = 8
+
+# One pooled session per process so repeated steps reuse TCP/TLS connections.
+# Only advertise encodings urllib3 can decode here (br needs `brotli` installed).
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=HN_MAX_WORKERS * 2))
+session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=HN_MAX_WORKERS * 2))
+session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+def run(params: dict, context: dict = None):
+    step_type = params.get("_step_type", "api.http_get")
+
+    if step_type == "api.http_get":
+        return http_get(params, context)
+    elif step_type == "api.fetch_hacker_news":
+        return fetch_hacker_news(params, context)
+    else:
+        print(f"⚠️ Unknown API step: {step_type}")
+        return None
+
+
+def http_get(params: dict, context: dict = None):
     url = params.get("url")
-    print(f"🌐 [HTTP] Making GET request to: {url}")
-    return f"Fetched from {url} (mocked)"
+    if not url:
+        raise ValueError("Missing 'url' for api.http_get step.")
+
+    timeout = request_timeout(context, float(params.get("timeout", DEFAULT_TIMEOUT)))
+    max_bytes = int(params.get("max_bytes", DEFAULT_MAX_BYTES))
+    json_paths = params.get("json_paths") or []
+    save_to = params.get("save_to")
+
+    print(f"🌐 [HTTP] GET {url}")
+
+    try:
+        with session.get(url, params=params.get("query"), headers=params.get("headers"),
+                         timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                print(f"❌ Request failed: {response.status_code} {response.reason}")
+                return None
+
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ResponseTooLarge(f"Content-Length {declared} exceeds max_bytes={max_bytes}")
+
+            if save_to:
+                written = _stream_to_file(response, save_to, max_bytes)
+                print(f"💾 [HTTP] Saved {written} bytes to {save_to}")
+                return save_to
+
+            body = _read_limited(response, max_bytes)
+            content_type = response.headers.get("Content-Type", "")
+    except ResponseTooLarge as e:
+        print(f"❌ {e}")
+        return None
+    except requests.RequestException as e:
+        print(f"❌ Request to {url} failed: {e}")
+        return None
+
+    if json_paths or "json" in content_type:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body.decode(response.encoding or "utf-8", errors="replace")
+        if json_paths:
+            return {path: extract_path(data, path) for path in json_paths}
+        return data
+
+    return body.decode(response.encoding or "utf-8", errors="replace")
+
+
+def fetch_hacker_news(params: dict, context: dict = None):
+    limit = int(params.get("limit", 10))
+    timeout = request_timeout(context, float(params.get("timeout", DEFAULT_TIMEOUT)))
+    base = params.get("base_url", HN_API).rstrip("/")
+
+    print(f"📰 [HN] Fetching top {limit} stories...")
+
+    try:
+        res = session.get(f"{base}/topstories.json", timeout=timeout)
+        res.raise_for_status()
+        ids = res.json()[:limit]
+    except requests.RequestException as e:
+        print(f"❌ Failed to fetch top stories: {e}")
+        return None
+
+    def fetch_item(item_id):
+        try:
+            r = session.get(f"{base}/item/{item_id}.json", timeout=timeout)
+            r.raise_for_status()
+            return r.json()
+        except requests.RequestException as e:
+            print(f"⚠️ Failed to fetch HN item {item_id}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(HN_MAX_WORKERS, max(len(ids), 1))) as pool:
+        items = list(pool.map(fetch_item, ids))  # map() keeps ranking order
+
+    lines = [
+        f"- {item.get('title')} ({item.get('url', 'no link')})"
+        for item in items if item
+    ]
+    return "\n".join(lines) or "No stories found."
+
+
+def extract_path(data, path: str):
+    """Walk a dotted path like 'items.0.title' through nested dicts/lists."""
+    current = data
+    for part in path.split("."):
+        if isinstance(current, list) and part.lstrip("-").isdigit():
+            index = int(part)
+            current = current[index] if -len(current) <= index < len(current) else None
+        elif isinstance(current, dict):
+            current = current.get(part)
+        else:
+            return None
+        if current is None:
+            return None
+    return current
+
+
+def _read_limited(response, max_bytes: int) -> bytes:
+    chunks, total = [], 0
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_bytes:
+            raise ResponseTooLarge(f"Response body exceeds max_bytes={max_bytes}")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _stream_to_file(response, path: str, max_bytes: int) -> int:
+    # Write to a temp file next to the target so a truncated download never
+    # replaces a previous good file.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    total = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise ResponseTooLarge(f"Response body exceeds max_bytes={max_bytes}")
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return total
@@ -1,5 +1,10 @@
 import requests
 from core.secrets import SecretsManager
+from core.state import NO_CHANGES
+from core.utils import as_bool, request_timeout
+
+GITHUB_API = "https://api.github.com"
+MAX_ISSUE_PAGES = 10  # 100 issues per page
 
 def run(params: dict, context: dict = None):
     secrets = SecretsManager()
@@ -10,6 +15,7 @@ def run(params: dict, context: dict = None):
         return None
 
     step_type = params["_step_type"]
+    api_base = params.get("api_base", GITHUB_API)
 
     headers = {
         "Authorization": f"Bearer {token}",
@@ -18,21 +24,56 @@ def run(params: dict, context: dict = None):
 
     if step_type == "github.query_issues":
         repo = params["repo"]
-        url = f"https://api.github.com/repos/{repo}/issues"
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch issues: {response.status_code} {response.text}")
-            return None
-        issues = response.json()
-        summary = "\n".join([f"- #{i['number']}: {i['title']}" for i in issues if 'pull_request' not in i])
+        url = f"{api_base}/repos/{repo}/issues"
+        state = (context or {}).get("state")
+        incremental = state is not None and as_bool(params.get("incremental", False))
+        # Oldest-updated first, so a partial read still moves the cursor forward safely.
+        # Incremental runs also fetch closed issues so closing one counts as a change.
+        issue_state = params.get("state", "all" if incremental else "open")
+        query = {"state": issue_state, "sort": "updated", "direction": "asc", "per_page": 100}
+        if incremental:
+            # Only ask GitHub for issues touched since the last successful run
+            since = state.get(f"github.query_issues:{repo}:since")
+            if since:
+                query["since"] = since
+        issues, latest = [], None
+        for page in range(MAX_ISSUE_PAGES):
+            response = requests.get(url, headers=headers, params=query if page == 0 else None,
+                                    timeout=request_timeout(context))
+            if response.status_code != 200:
+                print(f"❌ Failed to fetch issues: {response.status_code} {response.text}")
+                if page == 0:
+                    return None
+                break  # keep the pages we did read; the cursor only covers those
+            items = response.json()
+            if items:
+                latest = max([latest or "", *(i["updated_at"] for i in items)])
+            issues.extend(i for i in items if 'pull_request' not in i)
+            next_page = response.links.get("next")
+            if not next_page:
+                break
+            url = next_page["url"]
+        if incremental:
+            if latest:
+                state.set(f"github.query_issues:{repo}:since", latest)
+            issues = state.filter_changed(
+                f"github.query_issues:{repo}:hashes", issues,
+                id_of=lambda i: i["number"], fields=["title", "body", "state"]
+            )
+            if not issues:
+                print("💤 No new or changed issues since last run.")
+                return NO_CHANGES
+        summary = "\n".join([
+            f"- #{i['number']}: {i['title']}" + (" (closed)" if i.get("state") == "closed" else "") for i in issues
+        ])
         return summary or "No issues found."
 
     elif step_type == "github.comment_pr":
         repo = params["repo"]
         pr_number = params["pr_number"]
         message = params["message"]
-        url = f"https://api.github.com/repos/{repo}/issues/{pr_number}/comments"
-        res = requests.post(url, headers=headers, json={"body": message})
+        url = f"{api_base}/repos/{repo}/issues/{pr_number}/comments"
+        res = requests.post(url, headers=headers, json={"body": message}, timeout=request_timeout(context))
         if res.status_code != 201:
             print(f"❌ Failed to post comment: {res.status_code} {res.text}")
             return None
@@ -43,8 +84,8 @@ def run(params: dict, context: dict = None):
         repo = params["repo"]
         pr_number = params["pr_number"]
         label_to_check = params.get("label")
-        url = f"https://api.github.com/repos/{repo}/issues/{pr_number}/labels"
-        response = requests.get(url, headers=headers)
+        url = f"{api_base}/repos/{repo}/issues/{pr_number}/labels"
+        response = requests.get(url, headers=headers, timeout=request_timeout(context))
         if response.status_code != 200:
             print(f"❌ Failed to check labels: {response.status_code} {response.text}")
             return None
@@ -55,8 +96,8 @@ def run(params: dict, context: dict = None):
         repo = params["repo"]
         title = params["title"]
         body = params["body"]
-        url = f"https://api.github.com/repos/{repo}/issues"
-        res = requests.post(url, headers=headers, json={"title": title, "body": body})
+        url = f"{api_base}/repos/{repo}/issues"
+        res = requests.post(url, headers=headers, json={"title": title, "body": body}, timeout=request_timeout(context))
         if res.status_code != 201:
             print(f"❌ Failed to create issue: {res.status_code} {res.text}")
             return None
@@ -65,8 +106,8 @@ def run(params: dict, context: dict = None):
     elif step_type == "github.get_pr_description":
         repo = params["repo"]
         pr_number = params["pr_number"]
-        url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
-        res = requests.get(url, headers=headers)
+        url = f"{api_base}/repos/{repo}/pulls/{pr_number}"
+        res = requests.get(url, headers=headers, timeout=request_timeout(context))
         if res.status_code != 200:
             print(f"❌ Failed to fetch PR: {res.status_code} {res.text}")
             return None
@@ -74,9 +115,9 @@ def run(params: dict, context: dict = None):
     elif step_type == "github.get_pr_diff":
         repo = params["repo"]
         pr_number = params["pr_number"]
-        url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
+        url = f"{api_base}/repos/{repo}/pulls/{pr_number}"
         headers["Accept"] = "application/vnd.github.v3.diff"  # Get diff format
-        res = requests.get(url, headers=headers)
+        res = requests.get(url, headers=headers, timeout=request_timeout(context))
         if res.status_code != 200:
             print(f"❌ Failed to fetch PR diff: {res.status_code} {res.text}")
             return None
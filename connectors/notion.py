@@ -1,9 +1,17 @@
 import requests
 from core.secrets import SecretsManager
+from core.state import NO_CHANGES
+from core.utils import as_bool, request_timeout
+
+NOTION_API = "https://api.notion.com/v1"
 
 def run(params: dict, context: dict = None):
     secrets = SecretsManager()
     notion_token = secrets.get("NOTION_TOKEN")
+    api_base = params.get("api_base", NOTION_API)
+
+    if params.get("_step_type") == "notion.query_database":
+        return query_database(params, context, notion_token, api_base)
 
     parent_id = params.get("parent_id")
     parent_type = params.get("parent_type", "database")
@@ -30,7 +38,7 @@ def run(params: dict, context: dict = None):
     title_property_name = None
 
     if parent_type == "database":
-        db_response = requests.get(f"https://api.notion.com/v1/databases/{parent_id}", headers=headers)
+        db_response = requests.get(f"{api_base}/databases/{parent_id}", headers=headers, timeout=request_timeout(context))
         if db_response.status_code != 200:
             print(f"❌ Failed to retrieve database schema: {db_response.status_code} {db_response.text}")
             return None
@@ -91,7 +99,7 @@ def run(params: dict, context: dict = None):
         "children": children
     }
 
-    response = requests.post("https://api.notion.com/v1/pages", headers=headers, json=body)
+    response = requests.post(f"{api_base}/pages", headers=headers, json=body, timeout=request_timeout(context))
 
     if response.status_code != 200:
         print(f"❌ Failed to create Notion page: {response.status_code} {response.text}")
@@ -99,3 +107,63 @@ def run(params: dict, context: dict = None):
 
     print("✅ Notion page created successfully")
     return response.json().get("url")
+
+
+def query_database(params: dict, context: dict, notion_token: str, api_base: str = NOTION_API):
+    database_id = params["database_id"]
+    headers = {
+        "Authorization": f"Bearer {notion_token}",
+        "Notion-Version": "2022-06-28",
+        "Content-Type": "application/json"
+    }
+
+    state = (context or {}).get("state")
+    incremental = state is not None and as_bool(params.get("incremental", False))
+    since_key = f"notion.query_database:{database_id}:since"
+
+    filters = [params["filter"]] if params.get("filter") else []
+    if incremental and state.get(since_key):
+        # Only pages edited since the last successful run
+        filters.append({
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": state.get(since_key)}
+        })
+
+    body = {"page_size": 100}
+    if len(filters) == 1:
+        body["filter"] = filters[0]
+    elif filters:
+        body["filter"] = {"and": filters}
+
+    pages = []
+    while True:
+        response = requests.post(f"{api_base}/databases/{database_id}/query", headers=headers, json=body, timeout=request_timeout(context))
+        if response.status_code != 200:
+            print(f"❌ Failed to query Notion database: {response.status_code} {response.text}")
+            return None
+        data = response.json()
+        pages.extend(data.get("results", []))
+        if not data.get("has_more"):
+            break
+        body["start_cursor"] = data.get("next_cursor")
+
+    if incremental:
+        if pages:
+            state.set(since_key, max(p["last_edited_time"] for p in pages))
+        pages = state.filter_changed(
+            f"notion.query_database:{database_id}:hashes", pages,
+            id_of=lambda p: p["id"], fields=["properties", "archived"]
+        )
+        if not pages:
+            print("💤 No new or changed Notion pages since last run.")
+            return NO_CHANGES
+
+    lines = [f"- {_page_title(p)} ({p.get('url')})" for p in pages]
+    return "\n".join(lines) or "No pages found."
+
+
+def _page_title(page: dict) -> str:
+    for prop in page.get("properties", {}).values():
+        if prop.get("type") == "title":
+            return "".join(t.get("plain_text", "") for t in prop.get("title", [])) or "Untitled"
+    return "Untitled"
@@ -18,7 +18,7 @@ REGISTRY = {
     },
     "slack.send_message": {
         "model_name": "SlackSendMessageStep",
-        "description": "Send a message to a Slack channel.",
+        "description": "Send a message to a Slack channel. Optional: webhook_url (incoming webhook instead of bot token), batch_mode='thread' to post bursts as thread replies.",
         "required_params": ["channel", "message"],
         "category": "communication"
     },
@@ -50,7 +50,7 @@ REGISTRY = {
     },
     "notion.query_database": {
         "model_name": "NotionQueryDatabaseStep",
-        "description": "Query a Notion database with filters.",
+        "description": "Query a Notion database with filters. Set incremental=true to only return new or changed pages.",
         "required_params": ["database_id"],
         "category": "productivity"
     },
@@ -88,7 +88,7 @@ REGISTRY = {
     },
     "github.query_issues": {
         "model_name": "GitHubQueryIssuesStep",
-        "description": "Query open issues from a GitHub repository.",
+        "description": "Query open issues from a GitHub repository. Set incremental=true to only return new or changed issues (including ones closed since the last run).",
         "required_params": ["repo"],
         "category": "devtools"
     },
@@ -119,6 +119,20 @@ REGISTRY = {
         "category": "api"
     },
 
+    # === HTTP / API ===
+    "api.http_get": {
+        "model_name": "APIHttpGetStep",
+        "description": "GET a URL. Optional: timeout, max_bytes, json_paths (dotted paths to extract), save_to (stream body to a file).",
+        "required_params": ["url"],
+        "category": "api"
+    },
+    "api.fetch_hacker_news": {
+        "model_name": "APIFetchHackerNewsStep",
+        "description": "Fetch the current top Hacker News stories (titles and links).",
+        "required_params": [],
+        "category": "api"
+    },
+
     # === Scheduler Triggers ===
     "scheduler.cron": {
         "model_name": "CronTrigger",
@@ -1,5 +1,279 @@
-def run(params: dict, context: dict) -> str:
+# connectors/slack.py
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import requests
+from requests.adapters import HTTPAdapter
+from core.secrets import SecretsManager
+from core.utils import StepCancelled, request_timeout
+
+SLACK_API = "https://slack.com/api"
+SEND_TIMEOUT = 10
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Slack allows ~1 message/s per channel; Discord webhooks share a small bucket
+# (5 requests / 2s) that we also track from the X-RateLimit-* headers.
+SLACK_MIN_INTERVAL = 1.0
+DISCORD_MIN_INTERVAL = 0.4
+SLACK_MAX_CHARS = 4000
+DISCORD_MAX_CHARS = 2000
+QUEUE_IDLE_TIMEOUT = 60  # seconds before an idle channel's queue and thread go away
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ChannelQueue:
+    """
+    Serializes sends to one channel/webhook. Messages that pile up while we wait
+    out the rate limit are coalesced into a single post (split at `max_chars`),
+    so a burst of N alerts costs a handful of requests instead of N. Queues
+    registered in `queues` under `key` retire after QUEUE_IDLE_TIMEOUT idle.
+    """
+
+    def __init__(self, send, min_interval: float, max_chars: int, key: str = None):
+        self.key = key
+        self.send = send
+        self.min_interval = min_interval
+        self.max_chars = max_chars
+        self.pending = []
+        self.lock = threading.Condition()
+        self.next_send_at = 0.0
+        self.thread_ts = None  # parent message of the current burst (Slack thread mode)
+        self.worker = threading.Thread(target=self._loop, daemon=True)
+        self.worker.start()
+
+    def submit(self, text: str, threaded: bool = False) -> Future:
+        future = Future()
+        with self.lock:
+            self.pending.append((text, threaded, future))
+            self.lock.notify()
+        return future
+
+    def _loop(self):
+        while self._wait_for_work():
+            wait = self.next_send_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)  # let more messages accumulate meanwhile
+            batch = []
+            try:
+                with self.lock:
+                    batch = self._take_batch()
+                if batch:
+                    self._deliver(batch)
+            except Exception as e:
+                # Fail this batch's senders but keep the channel's queue alive
+                self.next_send_at = time.monotonic() + self.min_interval
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _wait_for_work(self) -> bool:
+        """Block until messages are pending; False once the queue has retired after idling."""
+        while True:
+            with self.lock:
+                while not self.pending:
+                    self.thread_ts = None  # queue drained: the burst is over
+                    if not self.lock.wait(QUEUE_IDLE_TIMEOUT):
+                        break
+                if self.pending:
+                    return True
+            # Same lock order as enqueue(), so nothing can be submitted to a retired queue
+            with queues_lock, self.lock:
+                if self.pending:
+                    continue
+                if queues.get(self.key) is self:
+                    del queues[self.key]
+                return False
+
+    def _take_batch(self) -> list:
+        batch, size = [], 0
+        while self.pending:
+            text, threaded, future = self.pending[0]
+            if batch and (threaded != batch[0][1] or size + len(text) + 1 > self.max_chars):
+                break
+            self.pending.pop(0)
+            if not future.set_running_or_notify_cancel():
+                continue  # the sender stopped waiting for it
+            batch.append((text, threaded, future))
+            size += len(text) + 1
+        return batch
+
+    def _deliver(self, batch: list):
+        threaded = batch[0][1]
+        for i, (text, finished) in enumerate(self._posts(batch)):
+            if i:
+                time.sleep(max(0.0, self.next_send_at - time.monotonic()))
+            result = self._send_with_retries(text, threaded)
+            # Senders whose text is now fully posted succeed even if a later post fails
+            for future in finished:
+                future.set_result(result)
+
+    def _posts(self, batch: list) -> list:
+        """Pack the batch into posts of at most `max_chars` as (text, futures completed by it)."""
+        posts = []
+        for text, _, future in batch:
+            for piece in split_message(text, self.max_chars):
+                if posts and len(posts[-1][0]) + len(piece) + 1 <= self.max_chars:
+                    posts[-1][0] = f"{posts[-1][0]}\n{piece}"
+                else:
+                    posts.append([piece, []])
+            posts[-1][1].append(future)
+        return posts
+
+    def _send_with_retries(self, text: str, threaded: bool):
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                result, wait = self.send(text, self.thread_ts if threaded else None)
+            except RateLimited as e:
+                if attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                print(f"⏳ Rate limited, retrying in {e.retry_after}s")
+                time.sleep(e.retry_after)
+                continue
+            if threaded and self.thread_ts is None:
+                self.thread_ts = result
+            self.next_send_at = time.monotonic() + max(self.min_interval, wait)
+            return result
+
+
+def split_message(text: str, max_chars: int) -> list:
+    """Split text into posts of at most `max_chars`, preferring line breaks."""
+    chunks = []
+    while len(text) > max_chars:
+        cut = text.rfind("\n", 0, max_chars + 1)
+        if cut <= 0:
+            chunks.append(text[:max_chars])
+            text = text[max_chars:]
+        else:
+            chunks.append(text[:cut])
+            text = text[cut + 1:]
+    chunks.append(text)
+    return chunks
+
+
+queues = {}
+queues_lock = threading.Lock()
+
+
+def enqueue(key: str, send, min_interval: float, max_chars: int, text: str, threaded: bool = False) -> Future:
+    """Queue a message on the channel's ChannelQueue, starting one if needed."""
+    with queues_lock:
+        if key not in queues:
+            queues[key] = ChannelQueue(send, min_interval, max_chars, key=key)
+        return queues[key].submit(text, threaded)
+
+
+def run(params: dict, context: dict = None) -> str:
+    step_type = params.get("_step_type", "slack.send_message")
+
+    if step_type == "slack.send_message":
+        return send_slack_message(params, context)
+    elif step_type == "discord.send_message":
+        return send_discord_message(params, context)
+    else:
+        print(f"⚠️ Unknown messaging step: {step_type}")
+        return None
+
+
+def send_slack_message(params: dict, context: dict = None) -> str:
     channel = params.get("channel")
     message = params.get("message")
+    if message is None:
+        print("❌ Slack step has no message to send")
+        return None
+    message = str(message)
+    webhook_url = params.get("webhook_url")
+    threaded = params.get("batch_mode") == "thread" and not webhook_url
     print(f"💬 [Slack] Posting to #{channel}: {message}")
+
+    if webhook_url:
+        key, send = f"slack-webhook:{webhook_url}", lambda text, _: _post_slack_webhook(webhook_url, text)
+    else:
+        api_base = params.get("api_base", SLACK_API)
+        token = _slack_token()
+        key, send = f"slack:{api_base}:{channel}", lambda text, ts: _post_slack_api(api_base, token, channel, text, ts)
+
+    _wait_for(enqueue(key, send, SLACK_MIN_INTERVAL, SLACK_MAX_CHARS, message, threaded), context)
     return f"Message sent to Slack channel: #{channel}"
+
+
+def send_discord_message(params: dict, context: dict = None) -> str:
+    webhook_url = params.get("webhook_url")
+    content = params.get("content") or params.get("message")
+    if content is None:
+        print("❌ Discord step has no content to send")
+        return None
+    content = str(content)
+    print(f"💬 [Discord] Posting via webhook: {content}")
+
+    future = enqueue(
+        f"discord:{webhook_url}",
+        lambda text, _: _post_discord_webhook(webhook_url, text),
+        DISCORD_MIN_INTERVAL,
+        DISCORD_MAX_CHARS,
+        content,
+    )
+    _wait_for(future, context)
+    return "Message sent to Discord webhook"
+
+
+def _wait_for(future: Future, context: dict):
+    try:
+        return future.result(timeout=request_timeout(context, 120))
+    except (FutureTimeout, StepCancelled):
+        future.cancel()  # drops the message unless it's already being posted
+        raise
+
+
+def _slack_token() -> str:
+    return SecretsManager().get("SLACK_BOT_TOKEN")
+
+
+def _post_slack_api(api_base: str, token: str, channel: str, text: str, thread_ts: str = None):
+    body = {"channel": channel, "text": text}
+    if thread_ts:
+        body["thread_ts"] = thread_ts
+    res = session.post(f"{api_base}/chat.postMessage", json=body, timeout=SEND_TIMEOUT,
+                       headers={"Authorization": f"Bearer {token}"})
+    if res.status_code == 429:
+        raise RateLimited(float(res.headers.get("Retry-After", 1)))
+    data = res.json()
+    if not data.get("ok"):
+        raise RuntimeError(f"Slack API error: {data.get('error')}")
+    return data.get("ts"), 0.0
+
+
+def _post_slack_webhook(webhook_url: str, text: str):
+    res = session.post(webhook_url, json={"text": text}, timeout=SEND_TIMEOUT)
+    if res.status_code == 429:
+        raise RateLimited(float(res.headers.get("Retry-After", 1)))
+    if res.status_code != 200:
+        raise RuntimeError(f"Slack webhook error: {res.status_code} {res.text}")
+    return None, 0.0
+
+
+def _post_discord_webhook(webhook_url: str, text: str):
+    res = session.post(webhook_url, json={"content": text}, timeout=SEND_TIMEOUT)
+    if res.status_code == 429:
+        try:
+            retry_after = float(res.json().get("retry_after", 1))
+        except ValueError:
+            retry_after = float(res.headers.get("Retry-After", 1))
+        raise RateLimited(retry_after)
+    if res.status_code not in (200, 204):
+        raise RuntimeError(f"Discord webhook error: {res.status_code} {res.text}")
+    # Respect the webhook bucket before it runs dry
+    wait = 0.0
+    if res.headers.get("X-RateLimit-Remaining") == "0":
+        wait = float(res.headers.get("X-RateLimit-Reset-After", 0))
+    return None, wait
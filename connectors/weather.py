@@ -2,6 +2,7 @@
 
 import requests
 from core.secrets import SecretsManager
+from core.utils import request_timeout
 
 def run(params: dict, context: dict = None) -> str:
     secrets = SecretsManager()
@@ -22,7 +23,7 @@ def run(params: dict, context: dict = None) -> str:
         "units": units,
         "lang": lang,
         "appid": api_key
-    })
+    }, timeout=request_timeout(context))
 
     if response.status_code != 200:
         print(f"❌ Failed to fetch weather for {location}: {response.text}")
@@ -0,0 +1,219 @@
+# core/estimator.py
+
+import json
+import os
+import re
+
+from core.utils import file_lock, write_atomic
+
+STATS_PATH = ".flowpilot_stats.json"
+MAX_SAMPLES = 50
+
+# Rough static cost model per step type:
+#   service      → which rate limit bucket the calls count against
+#   requests     → HTTP calls per run (callable when it depends on params)
+#   latency      → fallback seconds per step when no history exists
+#   output_chars → typical size of the step's output, used to size downstream prompts
+STEP_COSTS = {
+    "ai.summarize": {"service": "openai", "requests": 1, "latency": 3.0, "output_chars": 600},
+    "email.send": {"service": "email", "requests": 1, "latency": 0.5, "output_chars": 20},
+    "slack.send_message": {"service": "slack", "requests": 1, "latency": 0.4, "output_chars": 60},
+    "discord.send_message": {"service": "discord", "requests": 1, "latency": 0.4, "output_chars": 60},
+    "notion.create_page": {
+        "service": "notion",
+        # database parents fetch the schema before creating the page
+        "requests": lambda p: 1 if p.get("parent_type") == "page" else 2,
+        "latency": 1.2, "output_chars": 80,
+    },
+    "notion.create_task": {"service": "notion", "requests": 2, "latency": 1.2, "output_chars": 80},
+    "notion.append_block": {"service": "notion", "requests": 1, "latency": 0.8, "output_chars": 80},
+    "notion.update_page": {"service": "notion", "requests": 1, "latency": 0.8, "output_chars": 80},
+    "notion.query_database": {"service": "notion", "requests": 1, "latency": 1.0, "output_chars": 2000},
+    "github.query_issues": {"service": "github", "requests": 1, "latency": 0.8, "output_chars": 1500},
+    "github.get_pr_description": {"service": "github", "requests": 1, "latency": 0.6, "output_chars": 1500},
+    "github.get_pr_diff": {"service": "github", "requests": 1, "latency": 0.9, "output_chars": 8000},
+    "github.comment_pr": {"service": "github", "requests": 1, "latency": 0.8, "output_chars": 80},
+    "github.comment_issue": {"service": "github", "requests": 1, "latency": 0.8, "output_chars": 80},
+    "github.label_check": {"service": "github", "requests": 1, "latency": 0.5, "output_chars": 5},
+    "github.add_label": {"service": "github", "requests": 1, "latency": 0.5, "output_chars": 80},
+    "github.create_issue": {"service": "github", "requests": 1, "latency": 0.9, "output_chars": 80},
+    "github.close_issue": {"service": "github", "requests": 1, "latency": 0.6, "output_chars": 80},
+    "github.create_repo": {"service": "github", "requests": 1, "latency": 1.5, "output_chars": 80},
+    "weather.fetch_forecast": {"service": "openweathermap", "requests": 1, "latency": 0.5, "output_chars": 80},
+    "api.http_get": {"service": "http", "requests": 1, "latency": 1.0, "output_chars": 4000},
+    "api.fetch_hacker_news": {
+        "service": "hacker_news",
+        "requests": lambda p: 1 + int(p.get("limit", 10)),
+        "latency": 1.5, "output_chars": 1200,
+    },
+    "doc.generate_summary": {"service": "local", "requests": 0, "latency": 0.1, "output_chars": 600},
+    "doc.save_to_file": {"service": "local", "requests": 0, "latency": 0.1, "output_chars": 40},
+}
+DEFAULT_COST = {"service": "other", "requests": 1, "latency": 1.0, "output_chars": 500}
+
+# Requests per hour each service tolerates (tokens per hour for openai_tokens)
+RATE_LIMITS = {
+    "github": 5000,
+    "notion": 3 * 3600,
+    "openai": 3500 * 60,
+    "openai_tokens": 90_000 * 60,
+    "slack": 3600,
+    "discord": 30 * 60,
+}
+
+SUMMARIZE_OVERHEAD_TOKENS = 15   # "Summarize this:" wrapper + chat framing
+SUMMARY_OUTPUT_TOKENS = 200
+
+STEP_REF = re.compile(r"steps\.(\d+)\.output")
+
+
+def load_latency_stats(path: str = STATS_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def record_step_latencies(samples: list, path: str = STATS_PATH):
+    """
+    Append (step_type, seconds) samples so future estimates use observed timings.
+    Callers batch a whole run's samples into one call to keep lock traffic low.
+    """
+    if not samples:
+        return
+    with file_lock(path):
+        stats = load_latency_stats(path)
+        for step_type, seconds in samples:
+            history = stats.setdefault(step_type, [])
+            history.append(round(seconds, 4))
+            del history[:-MAX_SAMPLES]
+        write_atomic(path, lambda f: json.dump(stats, f))
+
+
+def count_tokens(text: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.encoding_for_model("gpt-3.5-turbo").encode(text))
+    except Exception:
+        # ~4 characters per token for English text
+        return max(1, len(text) // 4)
+
+
+def runs_per_hour(trigger: dict, webhook_rate: float = 1.0) -> float:
+    """Peak runs per hour implied by a trigger (webhooks use `webhook_rate`)."""
+    # Accept raw LLM output too, where the type may still be "scheduler.cron"
+    if trigger.get("type", "").split(".")[0] != "scheduler":
+        return webhook_rate
+    expression = trigger.get("params", {}).get("expression", "0 9 * * *")
+    fields = str(expression).split()
+    if len(fields) < 2:
+        return 1.0
+    try:
+        return float(len(_cron_values(fields[0], 0, 59)))
+    except ValueError:
+        print(f"⚠️ Can't parse cron minute field '{fields[0]}' — assuming 1 run/hour")
+        return 1.0
+
+
+def _cron_values(field: str, low: int, high: int) -> set:
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+        if part in ("*", ""):
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"invalid cron field '{field}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def estimate_workflow(data: dict, stats: dict = None, webhook_rate: float = 1.0) -> dict:
+    stats = load_latency_stats() if stats is None else stats
+    output_chars = {}
+    steps = []
+
+    for i, step in enumerate(data.get("steps", [])):
+        step_type = step.get("type", "")
+        params = step.get("params", {})
+        cost = STEP_COSTS.get(step_type, DEFAULT_COST)
+
+        requests = _step_requests(step_type, cost, params)
+
+        samples = stats.get(step_type)
+        latency = sum(samples) / len(samples) if samples else cost["latency"]
+
+        tokens_in = tokens_out = 0
+        if step_type == "ai.summarize":
+            tokens_in = _prompt_tokens(str(params.get("text", "")), output_chars) + SUMMARIZE_OVERHEAD_TOKENS
+            tokens_out = SUMMARY_OUTPUT_TOKENS
+            output_chars[i] = tokens_out * 4
+        else:
+            output_chars[i] = cost["output_chars"]
+
+        steps.append({
+            "index": i,
+            "type": step_type,
+            "service": cost["service"],
+            "requests": requests,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "latency": latency,
+            "latency_source": "history" if samples else "default",
+        })
+
+    rate = runs_per_hour(data.get("trigger", {}), webhook_rate)
+    per_service = {}
+    for s in steps:
+        per_service[s["service"]] = per_service.get(s["service"], 0) + s["requests"]
+    tokens = sum(s["tokens_in"] + s["tokens_out"] for s in steps)
+    if tokens:
+        per_service["openai_tokens"] = tokens
+
+    return {
+        "name": data.get("name", "unnamed"),
+        "steps": steps,
+        "requests": sum(s["requests"] for s in steps),
+        "tokens": tokens,
+        "wall_time": sum(s["latency"] for s in steps),
+        "runs_per_hour": rate,
+        "per_service": per_service,
+        "warnings": check_rate_limits({k: v * rate for k, v in per_service.items()}),
+    }
+
+
+def _step_requests(step_type: str, cost: dict, params: dict) -> int:
+    if not callable(cost["requests"]):
+        return cost["requests"]
+    try:
+        return cost["requests"](params)
+    except (TypeError, ValueError):
+        # e.g. a templated limit like "{{ trigger.count }}" that's only known at run time
+        print(f"⚠️ Can't size {step_type} from its params — using the default request count")
+        return cost["requests"]({})
+
+
+def check_rate_limits(hourly_usage: dict) -> list:
+    warnings = []
+    for service, used in hourly_usage.items():
+        limit = RATE_LIMITS.get(service)
+        if limit and used > limit:
+            warnings.append(f"{service}: ~{used:.0f}/h exceeds limit of {limit}/h")
+    return warnings
+
+
+def _prompt_tokens(text: str, output_chars: dict) -> int:
+    # Static text is tokenized; referenced step outputs use their predicted size
+    refs = [int(m) for m in STEP_REF.findall(text)]
+    static = STEP_REF.sub("", text)
+    predicted = sum(output_chars.get(ref, DEFAULT_COST["output_chars"]) for ref in refs) // 4
+    return count_tokens(static) + predicted
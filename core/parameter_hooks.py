@@ -1,5 +1,9 @@
-def notion_create_page_hook(params):
+def notion_create_page_hook(params, gaps=None):
+    # With `gaps`, report what's needed instead of asking on stdin
     if "parent_type" not in params:
+        if gaps is not None:
+            gaps.append({"param": "parent_type", "choices": ["database", "page"]})
+            return params
         choice = input("🔧 Notion: Is the parent a 'database' or a 'page'? [database/page]: ").strip().lower()
         if choice not in {"database", "page"}:
             print("⚠️ Invalid choice. Defaulting to 'database'.")
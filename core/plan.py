@@ -0,0 +1,242 @@
+# core/plan.py
+
+import hashlib
+import importlib
+import json
+import marshal
+import os
+import pickle
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from jinja2 import Environment
+
+from core.estimator import STEP_REF
+from core.schema import Workflow
+from core.utils import registry_version, write_atomic
+
+PLAN_CACHE_DIR = os.path.join(".flowpilot_cache", "plans")
+PLAN_FORMAT = 2
+
+TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+env = Environment()
+
+
+class PlanStep(NamedTuple):
+    index: int
+    type: str
+    handler: Optional[Callable]
+    params: Any                  # frozen param tree; templated strings become CompiledTemplate
+    dependencies: frozenset      # indexes of steps whose output this step's params reference
+    timeout: Optional[float]
+    retries: int
+    on_error: str
+    fallback: Any
+    parallel: bool
+
+
+class ExecutionPlan(NamedTuple):
+    """Immutable, ready-to-run form of a Workflow."""
+    name: str
+    trigger_params: Any
+    steps: Tuple[PlanStep, ...]
+
+
+class TemplateError(NamedTuple):
+    message: str
+
+
+class CompiledTemplate(NamedTuple):
+    source: str
+    code: Any        # jinja's generated code object; marshal-able for the plan cache
+    template: Any
+
+
+class _TemplateCode(NamedTuple):
+    # On-disk form of a CompiledTemplate
+    source: str
+    code: bytes
+
+
+def compile_template(source: str, code=None):
+    code = code if code is not None else env.compile(source)
+    return CompiledTemplate(source, code, env.template_class.from_code(env, code, env.make_globals(None)))
+
+
+# === Compiling ===
+
+def compile_workflow(workflow: Workflow, handlers: dict) -> ExecutionPlan:
+    steps = []
+    for i, step in enumerate(workflow.steps):
+        steps.append(PlanStep(
+            index=i,
+            type=step.type,
+            handler=resolve_handler(step.type, step.params, handlers),
+            params=_freeze(step.params),
+            dependencies=frozenset(int(ref) for ref in STEP_REF.findall(json.dumps(step.params))),
+            timeout=step.timeout,
+            retries=step.retries,
+            on_error=step.on_error,
+            fallback=_freeze(step.fallback),
+            parallel=step.parallel,
+        ))
+    return ExecutionPlan(
+        name=workflow.name,
+        trigger_params=_freeze(workflow.trigger.params, compile_templates=False),
+        steps=tuple(steps),
+    )
+
+
+def resolve_handler(step_type: str, params: dict, handlers: dict):
+    # Static handlers first, then the connector module named by _step_type (e.g. github.query_issues)
+    if step_type in handlers:
+        return handlers[step_type]
+    step_meta_type = params.get("_step_type", "")
+    if "." in step_meta_type:
+        module_name = step_meta_type.split(".")[0]
+        try:
+            return importlib.import_module(f"connectors.{module_name}").run
+        except Exception as e:
+            print(f"❌ Failed to load connector '{module_name}' for {step_type}: {e}")
+    return None
+
+
+def _freeze(obj, compile_templates: bool = True):
+    if isinstance(obj, str):
+        if compile_templates and any(marker in obj for marker in TEMPLATE_MARKERS):
+            try:
+                return compile_template(obj)
+            except Exception as e:
+                return TemplateError(f"[Template error: {e}]")
+        return obj
+    elif isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v, compile_templates) for k, v in obj.items()})
+    elif isinstance(obj, list):
+        return tuple(_freeze(v, compile_templates) for v in obj)
+    return obj
+
+
+# === Rendering ===
+
+def render(obj, context):
+    """Resolve a frozen param tree against the run context into plain dicts/lists."""
+    if isinstance(obj, str):
+        return obj
+    elif isinstance(obj, CompiledTemplate):
+        try:
+            return obj.template.render(context)
+        except Exception as e:
+            return f"[Template error: {e}]"
+    elif isinstance(obj, TemplateError):
+        return obj.message
+    elif isinstance(obj, MappingProxyType):
+        return {k: render(v, context) for k, v in obj.items()}
+    elif isinstance(obj, tuple):
+        return [render(v, context) for v in obj]
+    return obj
+
+
+# === Binary cache ===
+
+def plan_cache_key(raw: bytes, handlers: dict) -> str:
+    # marshal'd code objects are only valid for the interpreter that wrote them
+    parts = [hashlib.sha256(raw).hexdigest(), registry_version(), handlers_fingerprint(handlers),
+             sys.implementation.cache_tag, str(PLAN_FORMAT)]
+    return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+
+def handlers_fingerprint(handlers: dict) -> str:
+    """Changes whenever a step type is mapped to a different handler."""
+    names = {step_type: f"{getattr(fn, '__module__', '?')}.{getattr(fn, '__qualname__', repr(fn))}"
+             for step_type, fn in handlers.items()}
+    return hashlib.sha256(json.dumps(names, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def load_plan(path: str, handlers: dict, cache_dir: str = PLAN_CACHE_DIR) -> ExecutionPlan:
+    """
+    Load a workflow file as an ExecutionPlan, reusing the on-disk plan when the
+    file, registry, handlers and interpreter are unchanged. Otherwise sanitize, validate,
+    compile, and write the plan for next time.
+    """
+    with open(path, "rb") as f:
+        return load_plan_bytes(f.read(), handlers, cache_dir)
+
+
+def load_plan_bytes(raw: bytes, handlers: dict, cache_dir: str = PLAN_CACHE_DIR) -> ExecutionPlan:
+    """Same as load_plan, for workflow JSON that didn't come from a local file (e.g. a queued job)."""
+    cache_path = os.path.join(cache_dir, f"{plan_cache_key(raw, handlers)}.plan")
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return _thaw_plan(pickle.load(f))
+        except Exception as e:
+            print(f"⚠️ Ignoring unusable plan cache {cache_path}: {e}")
+
+    # Imported here so loading a cached plan never pays for the OpenAI client setup
+    from core.prompt_handler import sanitize_workflow_dict
+
+    data = sanitize_workflow_dict(json.loads(raw), verbose=False)
+    plan = compile_workflow(Workflow(**data), handlers)
+
+    try:
+        serialized = _serialize_plan(plan)
+    except ValueError:
+        return plan  # e.g. handlers that can't be imported by name
+    # Plans are content-addressed, so concurrent writers produce identical files
+    write_atomic(cache_path, lambda f: pickle.dump(serialized, f, protocol=pickle.HIGHEST_PROTOCOL), binary=True)
+    return plan
+
+
+def _serialize_plan(plan: ExecutionPlan) -> dict:
+    steps = []
+    for step in plan.steps:
+        handler = None
+        if step.handler is not None:
+            handler = (step.handler.__module__, step.handler.__qualname__)
+            if "<" in handler[1]:
+                raise ValueError(f"Handler for {step.type} is not importable by name")
+        steps.append(step._replace(
+            handler=handler,
+            params=_serialize_tree(step.params),
+            fallback=_serialize_tree(step.fallback),
+        )._asdict())
+    return {"name": plan.name, "trigger_params": _serialize_tree(plan.trigger_params), "steps": steps}
+
+
+def _serialize_tree(obj):
+    if isinstance(obj, CompiledTemplate):
+        return _TemplateCode(obj.source, marshal.dumps(obj.code))
+    elif isinstance(obj, MappingProxyType):
+        return {k: _serialize_tree(v) for k, v in obj.items()}
+    elif isinstance(obj, tuple) and not isinstance(obj, TemplateError):
+        return tuple(_serialize_tree(v) for v in obj)
+    return obj
+
+
+def _thaw_plan(data: dict) -> ExecutionPlan:
+    steps = []
+    for raw_step in data["steps"]:
+        handler = raw_step["handler"]
+        if handler is not None:
+            module_name, attr = handler
+            handler = getattr(importlib.import_module(module_name), attr)
+        steps.append(PlanStep(**{
+            **raw_step,
+            "handler": handler,
+            "params": _thaw_tree(raw_step["params"]),
+            "fallback": _thaw_tree(raw_step["fallback"]),
+        }))
+    return ExecutionPlan(name=data["name"], trigger_params=_thaw_tree(data["trigger_params"]), steps=tuple(steps))
+
+
+def _thaw_tree(obj):
+    if isinstance(obj, _TemplateCode):
+        return compile_template(obj.source, marshal.loads(obj.code))
+    elif isinstance(obj, dict):
+        return MappingProxyType({k: _thaw_tree(v) for k, v in obj.items()})
+    elif isinstance(obj, tuple) and not isinstance(obj, TemplateError):
+        return tuple(_thaw_tree(v) for v in obj)
+    return obj
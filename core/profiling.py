@@ -0,0 +1,178 @@
+# core/profiling.py
+
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples in "sample" mode
+FINISH_TIMEOUT = 10              # seconds finish() waits for abandoned steps still running
+
+
+class StepProfiler:
+    """
+    Profiles individual workflow steps. Each call to `run()` executes one step in
+    the calling thread under cProfile ("cprofile" mode) or a stack sampler
+    ("sample" mode), plus tracemalloc for peak memory. `finish()` writes:
+
+    - step_<i>_<type>.prof   per-step cProfile dumps (cprofile mode)
+    - collapsed.txt          all steps as flamegraph-compatible collapsed stacks
+    - summary.json           wall time and peak memory per step
+
+    Steps can overlap (a timed-out step keeps running on its thread), so the
+    profiler counts calls in flight: tracemalloc runs while any call is active,
+    and peaks are process-wide when calls overlap.
+    The runner only creates a profiler when asked, so disabled runs pay nothing.
+    """
+
+    def __init__(self, output_dir: str, mode: str = "cprofile", interval: float = DEFAULT_SAMPLE_INTERVAL):
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile mode '{mode}'. Use 'cprofile' or 'sample'.")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.collapsed = Counter()
+        self.summary = []
+        self.seen = Counter()
+        self.running = {}               # in-flight call name → start time
+        self.owns_tracing = False
+        self.lock = threading.Condition()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(self, index: int, label: str, fn, *args):
+        name = f"step_{index}_{label}" if index >= 0 else label
+        with self.lock:
+            self.seen[name] += 1
+            if self.seen[name] > 1:
+                name = f"{name}_attempt{self.seen[name]}"  # retries get their own dump
+            if not self.running and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.owns_tracing = True
+            started = time.perf_counter()
+            self.running[name] = started
+        tracemalloc.reset_peak()
+
+        profile = sampler = None
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+        else:
+            sampler = _Sampler(threading.get_ident(), self.interval, self.run.__code__)
+            sampler.start()
+
+        try:
+            if profile:
+                return profile.runcall(fn, *args)
+            return fn(*args)
+        finally:
+            wall = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            try:
+                self._record(name, wall, peak, profile, sampler)
+            finally:
+                with self.lock:
+                    del self.running[name]
+                    if not self.running and self.owns_tracing:
+                        tracemalloc.stop()  # the last call out stops tracing
+                        self.owns_tracing = False
+                    self.lock.notify_all()
+
+    def _record(self, name: str, wall: float, peak: int, profile, sampler):
+        entry = {"step": name, "wall_seconds": round(wall, 6), "peak_memory_bytes": peak}
+        if profile:
+            path = os.path.join(self.output_dir, f"{_safe(name)}.prof")
+            profile.dump_stats(path)
+            entry["profile"] = path
+            stacks = collapse_cprofile(profile)
+        else:
+            sampler.stop()
+            stacks = sampler.counts
+            entry["samples"] = sum(stacks.values())
+
+        with self.lock:
+            self.summary.append(entry)
+            for stack, weight in stacks.items():
+                self.collapsed[f"{_safe(name)};{stack}"] += weight
+
+        print(f"⏱️ [Profile] {name}: {wall:.3f}s, peak {peak / 1024:.0f} KiB")
+
+    def finish(self, timeout: float = FINISH_TIMEOUT):
+        with self.lock:
+            # Give abandoned (timed-out) steps a moment to end; report the rest as unfinished
+            self.lock.wait_for(lambda: not self.running, timeout)
+            now = time.perf_counter()
+            for name, started in self.running.items():
+                self.summary.append({"step": name, "wall_seconds": round(now - started, 6), "status": "timed_out"})
+                print(f"⚠️ [Profile] {name} was still running after {now - started:.1f}s")
+            with open(os.path.join(self.output_dir, "collapsed.txt"), "w") as f:
+                for stack, weight in sorted(self.collapsed.items()):
+                    f.write(f"{stack} {weight}\n")
+            with open(os.path.join(self.output_dir, "summary.json"), "w") as f:
+                json.dump({"mode": self.mode, "steps": self.summary}, f, indent=2)
+        print(f"📈 Profiles written to {self.output_dir}")
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval (true stacks, low overhead)."""
+
+    def __init__(self, thread_id: int, interval: float, root_code):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root_code = root_code  # stop walking at the profiler frame
+        self.counts = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.root_code:
+                stack.append(_frame_label(frame.f_code.co_filename, frame.f_code.co_firstlineno, frame.f_code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def collapse_cprofile(profile) -> Counter:
+    """
+    Approximate collapsed stacks from cProfile data (weights in microseconds of
+    own time). cProfile only records caller edges, so each function is attributed
+    to its most expensive caller chain; use "sample" mode for exact stacks.
+    """
+    stats = pstats.Stats(profile).stats
+    collapsed = Counter()
+    for func, (_, _, own_time, _, callers) in stats.items():
+        weight = int(own_time * 1_000_000)
+        if weight <= 0:
+            continue
+        chain, seen, current = [func], {func}, func
+        while True:
+            parents = stats.get(current, (0, 0, 0, 0, {}))[4]
+            if not parents:
+                break
+            parent = max(parents, key=lambda c: parents[c][3])
+            if parent in seen:
+                break
+            chain.append(parent)
+            seen.add(parent)
+            current = parent
+        collapsed[";".join(_frame_label(*f) for f in reversed(chain))] += weight
+    return collapsed
+
+
+def _frame_label(filename: str, line: int, name: str) -> str:
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
@@ -1,30 +1,33 @@
 import os
 import json
-from openai import OpenAI
+import asyncio
+from functools import lru_cache
+from typing import List, Optional
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
 from core.schema import Workflow
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from connectors.registry import REGISTRY
 from core.parameter_hooks import HOOKS
 
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 MISSING = "[MISSING]"
 
-def generate_workflow(prompt: str) -> Workflow:
-    system_msg = (
-        "You are a helpful AI that generates automation workflows in JSON format. "
-        "Each workflow must include:\n"
-        "- A trigger of type 'scheduler' (event: 'cron') or 'webhook' (event: 'receive')\n"
-        "- A list of steps where each step has a valid 'type' from the registry\n"
-        "- All required 'params' for each step based on its type\n"
-        "If you do not know the value of a required param, use '[MISSING]'.\n"
-        "Do not invent unsupported triggers or step types. "
-        "The JSON should be valid and parsable."
-    )
+SYSTEM_MSG = (
+    "You are a helpful AI that generates automation workflows in JSON format. "
+    "Each workflow must include:\n"
+    "- A trigger of type 'scheduler' (event: 'cron') or 'webhook' (event: 'receive')\n"
+    "- A list of steps where each step has a valid 'type' from the registry\n"
+    "- All required 'params' for each step based on its type\n"
+    "If you do not know the value of a required param, use '[MISSING]'.\n"
+    "Do not invent unsupported triggers or step types. "
+    "The JSON should be valid and parsable."
+)
 
-    examples = """
+EXAMPLES = """
 User: Summarize GitHub issues and save to Notion
 JSON:
 {
@@ -64,23 +67,50 @@ JSON:
 }
 """
 
-    def build_connector_reference():
-        lines = ["Available connector steps:\n"]
-        for step_type, meta in REGISTRY.items():
-            desc = meta.get("description", "")
-            params = ", ".join(meta.get("required_params", []))
-            lines.append(f"- {step_type}: {desc} (params: {params})")
-        return "\n".join(lines)
+class ParameterGap(BaseModel):
+    """A value the generated workflow still needs from the user."""
+    step_index: Optional[int] = None   # None for workflow-level gaps such as the trigger
+    step_type: Optional[str] = None
+    param: str
+    choices: Optional[List[str]] = None
+
+class WorkflowDraft(BaseModel):
+    """Result of non-interactive generation: the workflow dict plus anything left to fill in."""
+    prompt: str
+    data: Optional[dict] = None
+    gaps: List[ParameterGap] = []
+    error: Optional[str] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.error is None and not self.gaps
+
+    def to_workflow(self) -> Workflow:
+        if not self.is_complete:
+            raise ValueError(f"Workflow draft is incomplete: {self.error or self.gaps}")
+        return Workflow(**self.data)
 
-    capability_list = build_connector_reference()
-    full_prompt = f"{capability_list}\n\n{examples}\nUser: {prompt}\nJSON:\n"
+@lru_cache(maxsize=1)
+def build_connector_reference() -> str:
+    # The registry is static for the lifetime of the process, so build this once
+    lines = ["Available connector steps:\n"]
+    for step_type, meta in REGISTRY.items():
+        desc = meta.get("description", "")
+        params = ", ".join(meta.get("required_params", []))
+        lines.append(f"- {step_type}: {desc} (params: {params})")
+    return "\n".join(lines)
 
+def build_messages(prompt: str) -> list:
+    full_prompt = f"{build_connector_reference()}\n\n{EXAMPLES}\nUser: {prompt}\nJSON:\n"
+    return [
+        {"role": "system", "content": SYSTEM_MSG},
+        {"role": "user", "content": full_prompt}
+    ]
+
+def generate_workflow(prompt: str) -> Workflow:
     response = client.chat.completions.create(
         model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": full_prompt}
-        ],
+        messages=build_messages(prompt),
         temperature=0.2,
         max_tokens=800
     )
@@ -96,7 +126,50 @@ JSON:
     except (json.JSONDecodeError, ValidationError) as e:
         raise ValueError(f"Invalid workflow output: {e}")
 
-def sanitize_workflow_dict(data: dict) -> dict:
+def draft_from_content(prompt: str, content: str) -> WorkflowDraft:
+    """Post-process a raw LLM reply without ever prompting on stdin."""
+    gaps = []
+    try:
+        data = json.loads(content)
+        # Missing required params are reported as gaps below instead of raising here
+        data = sanitize_workflow_dict(data, verbose=False, validate=False)
+        data = complete_trigger(data, gaps=gaps)
+        data = inject_step_metadata(data)
+        data = fill_missing_parameters(data, gaps=gaps)
+        if not gaps:
+            Workflow(**data)
+    except Exception as e:
+        # One bad reply must not abort a whole batch
+        return WorkflowDraft(prompt=prompt, gaps=gaps, error=f"Invalid workflow output: {e}")
+    return WorkflowDraft(prompt=prompt, data=data, gaps=gaps)
+
+async def generate_workflow_draft_async(prompt: str) -> WorkflowDraft:
+    try:
+        response = await async_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=build_messages(prompt),
+            temperature=0.2,
+            max_tokens=800
+        )
+    except Exception as e:
+        return WorkflowDraft(prompt=prompt, error=f"Generation failed: {e}")
+    return draft_from_content(prompt, response.choices[0].message.content)
+
+async def generate_workflows_async(prompts: List[str], max_concurrency: int = 5) -> List[WorkflowDraft]:
+    """
+    Generate many workflows concurrently, with at most `max_concurrency` LLM calls
+    in flight. Results come back in the same order as `prompts`; failures are
+    reported per draft instead of aborting the batch.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate(prompt: str) -> WorkflowDraft:
+        async with semaphore:
+            return await generate_workflow_draft_async(prompt)
+
+    return list(await asyncio.gather(*(generate(p) for p in prompts)))
+
+def sanitize_workflow_dict(data: dict, verbose: bool = True, validate: bool = True) -> dict:
     if "trigger" in data:
         trigger = data["trigger"]
         trigger_type = trigger.get("type", "")
@@ -122,10 +195,12 @@ def sanitize_workflow_dict(data: dict) -> dict:
             step["params"] = {"text": "Top news stories"}
         else:
             required = REGISTRY[step_type].get("required_params", [])
-            step["params"] = scrub_fake_placeholders(step["params"], required)
-            validate_step(step, i)
+            step["params"] = scrub_fake_placeholders(step.setdefault("params", {}), required)
+            if validate:
+                validate_step(step, i)
 
-    print("🧼 Sanitized workflow:", json.dumps(data, indent=2))
+    if verbose:
+        print("🧼 Sanitized workflow:", json.dumps(data, indent=2))
     return data
 
 def scrub_fake_placeholders(params: dict, keys: list) -> dict:
@@ -135,7 +210,7 @@ def scrub_fake_placeholders(params: dict, keys: list) -> dict:
             params[key] = MISSING
     return params
 
-def complete_trigger(workflow: dict) -> dict:
+def complete_trigger(workflow: dict, gaps: list = None) -> dict:
     trigger = workflow.get("trigger")
 
     if trigger and trigger.get("type") in {"scheduler", "webhook"} and "event" in trigger:
@@ -158,6 +233,10 @@ def complete_trigger(workflow: dict) -> dict:
                 workflow["trigger"]["params"]["expression"] = "0 9 * * *"
             return workflow
 
+    if gaps is not None:
+        gaps.append(ParameterGap(param="trigger", choices=["scheduler.cron", "webhook.receive"]))
+        return workflow
+
     print("⚠️ This workflow doesn't specify when or how it should run.")
     print("💡 What should trigger this workflow?")
     print("1. Scheduler (run every day at 9am)")
@@ -193,7 +272,7 @@ def validate_step(step: dict, step_index: int):
         raise ValueError(f"Missing parameters {missing} for step {step_index} ({step_type})")
 
 
-def fill_missing_parameters(data: dict) -> dict:
+def fill_missing_parameters(data: dict, gaps: list = None) -> dict:
     for i, step in enumerate(data.get("steps", [])):
         step_type = step.get("type")
         step_params = step.setdefault("params", {})
@@ -205,19 +284,27 @@ def fill_missing_parameters(data: dict) -> dict:
         for param in required:
             value = step_params.get(param)
             if value in (MISSING, "", None):
+                if gaps is not None:
+                    gaps.append(ParameterGap(step_index=i, step_type=step_type, param=param))
+                    continue
                 user_value = input(f"🔧 Step {i} ({step_type}): Please enter value for '{param}': ")
                 step_params[param] = user_value
 
         # 🔁 Run step-specific parameter hook
         if step_type in HOOKS:
-            step["params"] = HOOKS[step_type](step_params)
+            if gaps is None:
+                step["params"] = HOOKS[step_type](step_params)
+            else:
+                hook_gaps = []
+                step["params"] = HOOKS[step_type](step_params, gaps=hook_gaps)
+                gaps.extend(ParameterGap(step_index=i, step_type=step_type, **g) for g in hook_gaps)
 
     return data
 
 def inject_step_metadata(data: dict) -> dict:
     for step in data.get("steps", []):
         step_type = step.get("type", "")
-        dynamic_prefixes = ("github.", "notion.", "slack.", "discord.")
+        dynamic_prefixes = ("github.", "notion.", "slack.", "discord.", "api.")
         if any(step_type.startswith(prefix) for prefix in dynamic_prefixes):
             step.setdefault("params", {})["_step_type"] = step_type
     return data
@@ -0,0 +1,317 @@
+# core/queue.py
+
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, NamedTuple, Optional
+
+from core.state import merge_state
+
+QUEUE_PATH = os.path.join(".flowpilot_queue", "queue.db")
+DEFAULT_LEASE_SECONDS = 30
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class Job(NamedTuple):
+    id: str
+    kind: str          # "workflow" (whole run) or "step" (one step of a distributed run)
+    payload: dict
+    attempts: int
+
+
+class Broker(ABC):
+    """
+    Job queue interface used by workers. Delivery is at-least-once: a claimed job
+    is leased to one worker, kept alive with heartbeats, and handed to another
+    worker if the lease expires before `complete()` or `fail()` is called.
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: dict, job_id: str = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str):
+        raise NotImplementedError
+
+
+class ResultStore(ABC):
+    """Step outputs and workflow cursors shared between nodes."""
+
+    @abstractmethod
+    def create_run(self, run_id: str, workflow: str, mode: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_run_status(self, run_id: str, status: str, error: str = None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_run(self, run_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, run_id: str, step_index: int, output: Any, status: str = "done", state: dict = None):
+        """`state` holds the cursor updates the step staged; they're saved once the whole run succeeds."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def all(self, run_id: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_state(self, workflow: str) -> dict:
+        """Cursors/watermarks of a workflow, shared by every worker node."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_state(self, workflow: str, updates: dict):
+        """Merge staged updates into the workflow's stored state (see core.state.merge_state)."""
+        raise NotImplementedError
+
+
+class SqliteQueue(Broker, ResultStore):
+    """
+    Reference broker + result store on a single SQLite file. Safe across
+    processes on one machine, or across nodes that share the file over a
+    filesystem with working locks.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker_id TEXT,
+                    lease_until REAL,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (status, created);
+                CREATE TABLE IF NOT EXISTS runs (
+                    id TEXT PRIMARY KEY,
+                    workflow TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    run_id TEXT NOT NULL,
+                    step_index INTEGER NOT NULL,
+                    output TEXT,
+                    status TEXT NOT NULL,
+                    state TEXT,
+                    PRIMARY KEY (run_id, step_index)
+                );
+                CREATE TABLE IF NOT EXISTS state (
+                    workflow TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (workflow, key)
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps this usable from heartbeat threads
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # === Broker ===
+
+    def enqueue(self, kind: str, payload: dict, job_id: str = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            # INSERT OR IGNORE makes enqueueing with a deterministic id idempotent
+            db.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, payload, max_attempts, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), max_attempts, now, now),
+            )
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker stopped heartbeating and used up their attempts are dead
+                dead = db.execute(
+                    "SELECT payload FROM jobs WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                    (now,),
+                ).fetchall()
+                if dead:
+                    db.execute(
+                        "UPDATE jobs SET status = 'failed', error = 'lease expired too many times', updated = ? "
+                        "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                        (now, now),
+                    )
+                    for (payload,) in dead:
+                        self._fail_run(db, json.loads(payload).get("run_id"), "job lease expired too many times")
+                row = db.execute(
+                    "SELECT id, kind, payload, attempts FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return None
+                db.execute(
+                    "UPDATE jobs SET status = 'running', worker_id = ?, lease_until = ?, attempts = attempts + 1, updated = ? "
+                    "WHERE id = ?",
+                    (worker_id, now + lease_seconds, now, row[0]),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return Job(id=row[0], kind=row[1], payload=json.loads(row[2]), attempts=row[3] + 1)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now + lease_seconds, now, job_id, worker_id),
+            )
+        # False means the lease was lost and another worker may now own the job
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'done', lease_until = NULL, updated = ? WHERE id = ? AND worker_id = ?",
+                (time.time(), job_id, worker_id),
+            )
+
+    def fail(self, job_id: str, worker_id: str, error: str):
+        # Re-queue until max_attempts is reached
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute(
+                    "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+                    "error = ?, lease_until = NULL, updated = ? WHERE id = ? AND worker_id = ?",
+                    (error, time.time(), job_id, worker_id),
+                )
+                row = db.execute("SELECT status, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row and row[0] == "failed":
+                    self._fail_run(db, json.loads(row[1]).get("run_id"), error)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _fail_run(self, db, run_id: Optional[str], error: str):
+        # A job that gives up for good takes its run down with it
+        if run_id:
+            db.execute(
+                "UPDATE runs SET status = 'failed', error = ?, updated = ? WHERE id = ? AND status NOT IN ('done', 'failed')",
+                (error, time.time(), run_id),
+            )
+
+    def job_status(self, job_id: str) -> Optional[str]:
+        with self._connect() as db:
+            row = db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    # === ResultStore ===
+
+    def create_run(self, run_id: str, workflow: str, mode: str):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR IGNORE INTO runs (id, workflow, mode, status, created, updated) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (run_id, workflow, mode, now, now),
+            )
+
+    def set_run_status(self, run_id: str, status: str, error: str = None):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE runs SET status = ?, error = ?, updated = ? WHERE id = ?",
+                (status, error, time.time(), run_id),
+            )
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        with self._connect() as db:
+            row = db.execute("SELECT workflow, mode, status, error FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": run_id, "workflow": row[0], "mode": row[1], "status": row[2], "error": row[3],
+                "steps": self.all(run_id)}
+
+    def put(self, run_id: str, step_index: int, output: Any, status: str = "done", state: dict = None):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (run_id, step_index, output, status, state) VALUES (?, ?, ?, ?, ?)",
+                (run_id, step_index, json.dumps(output, default=str), status, json.dumps(state or {})),
+            )
+
+    def all(self, run_id: str) -> dict:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT step_index, output, status, state FROM results WHERE run_id = ? ORDER BY step_index", (run_id,)
+            ).fetchall()
+        return {
+            index: {"output": json.loads(output), "status": status, "state": json.loads(state or "{}")}
+            for index, output, status, state in rows
+        }
+
+    def load_state(self, workflow: str) -> dict:
+        with self._connect() as db:
+            rows = db.execute("SELECT key, value FROM state WHERE workflow = ?", (workflow,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def save_state(self, workflow: str, updates: dict):
+        if not updates:
+            return
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                placeholders = ", ".join("?" for _ in updates)
+                current = {
+                    key: json.loads(value) for key, value in db.execute(
+                        f"SELECT key, value FROM state WHERE workflow = ? AND key IN ({placeholders})",
+                        (workflow, *updates),
+                    )
+                }
+                for key, value in merge_state(current, updates).items():
+                    db.execute(
+                        "INSERT OR REPLACE INTO state (workflow, key, value) VALUES (?, ?, ?)",
+                        (workflow, key, json.dumps(value, default=str)),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
@@ -1,8 +1,23 @@
 from __future__ import annotations
 from pydantic import BaseModel, create_model, model_validator, TypeAdapter
-from typing import Literal, Union, List, Dict, Any
+from typing import Literal, Union, List, Dict, Any, Optional
 from connectors.registry import REGISTRY
 
+# === Step execution policy (shared by every step model) ===
+
+class StepPolicy(BaseModel):
+    timeout: Optional[float] = None     # seconds per attempt; None → runner default
+    retries: int = 0                    # extra attempts after the first failure
+    on_error: Literal["fail", "skip", "fallback"] = "fail"
+    fallback: Any = None                # output used (templates allowed) when on_error == "fallback"
+    parallel: bool = False              # worker step mode: start once referenced steps finish, not all earlier ones
+
+    @model_validator(mode="after")
+    def require_fallback(self):
+        if self.on_error == "fallback" and self.fallback is None:
+            raise ValueError("on_error 'fallback' requires a 'fallback' value")
+        return self
+
 # === Dynamically generate connector models from REGISTRY ===
 
 step_models = {}
@@ -23,7 +38,7 @@ for key, meta in REGISTRY.items():
     else:
         # Regular step
         fields["type"] = (Literal[key], key)
-        step_models[key] = create_model(model_name, **fields, __base__=BaseModel)
+        step_models[key] = create_model(model_name, **fields, __base__=StepPolicy)
 
 # === Build dynamic type unions ===
 Step = Union[tuple(step_models.values())]
@@ -0,0 +1,119 @@
+# core/state.py
+
+import hashlib
+import json
+import os
+import re
+
+from core.utils import file_lock, write_atomic
+
+STATE_DIR = ".flowpilot_state"
+
+# Returned by a polling step when nothing new or changed was found since the
+# last successful run. The runner skips every downstream step when it sees it.
+NO_CHANGES = "[NO_CHANGES]"
+
+
+class StateStore:
+    """
+    Persistent cursor/watermark store, one JSON file per workflow.
+    Steps stage updates with `set()`; the runner calls `save()` only after the
+    whole workflow succeeds, so a failed run re-processes the same items next time.
+    `save()` merges the staged updates into the file's current contents, so
+    concurrent runs of one workflow keep each other's keys.
+    """
+
+    def __init__(self, workflow_name: str, state_dir: str = STATE_DIR):
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", workflow_name or "workflow")
+        self.path = os.path.join(state_dir, f"{safe_name}.json")
+        self.data = self._load()
+        self.updates = {}   # keys staged since load, e.g. to hand to another worker
+        self.dirty = False
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable state file {self.path}: {e}")
+            return {}
+
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key: str, value):
+        self.data[key] = value
+        self.updates[key] = value
+        self.dirty = True
+
+    def apply(self, updates: dict):
+        for key, value in updates.items():
+            self.set(key, value)
+
+    def save(self):
+        if not self.dirty:
+            return
+        with file_lock(self.path):
+            data = merge_state(self._load(), self.updates)
+            write_atomic(self.path, lambda f: json.dump(data, f, indent=2, sort_keys=True))
+        self.data = data
+        self.updates = {}
+        self.dirty = False
+
+    def filter_changed(self, key: str, items: list, id_of, fields=None) -> list:
+        """
+        Return only the items whose content hash differs from the last run.
+        `id_of` maps an item to a stable id; `fields` limits which keys are hashed
+        (so e.g. a bumped `updated_at` alone doesn't count as a change).
+        """
+        seen = self.get(key, {})
+        changed = []
+        for item in items:
+            item_id = str(id_of(item))
+            digest = content_hash({f: item.get(f) for f in fields} if fields else item)
+            if seen.get(item_id) != digest:
+                changed.append(item)
+                seen[item_id] = digest
+        if changed:
+            self.set(key, seen)
+        return changed
+
+
+class SharedStateStore(StateStore):
+    """
+    StateStore kept in a worker ResultStore (see core.queue) instead of a local
+    file, so every node reads and advances the same cursors.
+    """
+
+    def __init__(self, workflow_name: str, store):
+        self.workflow_name = workflow_name
+        self.store = store
+        self.data = store.load_state(workflow_name)
+        self.updates = {}
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.store.save_state(self.workflow_name, self.updates)
+        self.data = merge_state(self.data, self.updates)
+        self.updates = {}
+        self.dirty = False
+
+
+def merge_state(current: dict, updates: dict) -> dict:
+    """Apply staged updates on top of stored state; dict values (e.g. content hashes) merge per item."""
+    merged = dict(current)
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def content_hash(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
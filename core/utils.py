@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from connectors.registry import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover threads in this process
+    fcntl = None
+
+path_locks = {}
+path_locks_lock = threading.Lock()
+
+
+def as_bool(value) -> bool:
+    """Interpret step params that may arrive as bools or rendered template strings."""
+    if isinstance(value, str):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    return bool(value)
+
+
+def registry_version() -> str:
+    """Short hash of the connector registry; changes whenever steps or params change."""
+    encoded = json.dumps(REGISTRY, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Hold an exclusive lock for read-modify-write of `path`, across threads and
+    (where fcntl exists) across processes via a sidecar `<path>.lock` file.
+    """
+    path = os.path.abspath(path)
+    with path_locks_lock:
+        lock = path_locks.setdefault(path, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def write_atomic(path: str, write, binary: bool = False):
+    """
+    Call `write(f)` on a unique temp file next to `path`, then swap it into
+    place, so readers never see a partial file and concurrent writers never
+    share a temp file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class StepCancelled(Exception):
+    """Raised inside a connector once the runner has given up on its step."""
+
+
+def request_timeout(context: dict, default: float = 30) -> float:
+    """
+    Timeout for an outgoing HTTP/LLM call made by a step. Bounded by the step's
+    deadline so in-flight calls end when the runner times the step out.
+    """
+    context = context or {}
+    cancel_event = context.get("cancel_event")
+    if cancel_event is not None and cancel_event.is_set():
+        raise StepCancelled("Step was cancelled")
+    deadline = context.get("deadline")
+    if deadline is None:
+        return default
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise StepCancelled("Step deadline exceeded")
+    return min(default, remaining)
@@ -0,0 +1,146 @@
+# core/workflow_cache.py
+
+import hashlib
+import json
+import os
+import re
+import time
+
+from core.schema import Workflow
+from core.utils import file_lock, registry_version, write_atomic
+
+CACHE_PATH = os.path.join(".flowpilot_cache", "workflows.json")
+MAX_ENTRIES = 200
+SIMILARITY_THRESHOLD = 0.6         # prompt vs cached prompt
+SAVED_SIMILARITY_THRESHOLD = 0.35  # prompt vs a saved workflow's name and step types (much shorter text)
+
+FILLER_WORDS = {"a", "an", "the", "please", "me", "my", "can", "you", "i", "want", "to", "and", "every", "each"}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and filler words so near-identical prompts share a key."""
+    words = re.sub(r"[^a-z0-9\s]", " ", prompt.lower()).split()
+    return " ".join(w for w in words if w not in FILLER_WORDS)
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class WorkflowCache:
+    """
+    Persistent cache of generated, validated workflows keyed on the normalized
+    prompt plus the registry version, so registry changes invalidate old entries.
+    Least recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = registry_version()
+        self.entries = self._load()
+        self.changed = set()   # keys this instance wrote since loading
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable workflow cache {self.path}: {e}")
+            return {}
+        # Entries from an older registry may reference steps or params that changed
+        return {k: v for k, v in entries.items() if v.get("registry_version") == self.version}
+
+    def _save(self):
+        with file_lock(self.path):
+            # Merge into the file as it is now, so entries other processes added survive
+            entries = self._load()
+            entries.update({k: self.entries[k] for k in self.changed})
+            if len(entries) > self.max_entries:
+                by_age = sorted(entries, key=lambda k: entries[k]["last_used"])
+                for stale in by_age[:len(entries) - self.max_entries]:
+                    del entries[stale]
+            write_atomic(self.path, lambda f: json.dump(entries, f))
+        self.entries = entries
+        self.changed.clear()
+
+    def key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.version}:{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str):
+        entry = self.entries.get(self.key(prompt))
+        if not entry:
+            return None
+        entry["last_used"] = time.time()
+        entry["hits"] = entry.get("hits", 0) + 1
+        self.changed.add(self.key(prompt))
+        self._save()
+        return Workflow(**entry["workflow"])
+
+    def put(self, prompt: str, workflow: Workflow):
+        key = self.key(prompt)
+        self.entries[key] = {
+            "prompt": prompt,
+            "normalized": normalize_prompt(prompt),
+            "registry_version": self.version,
+            "workflow": workflow.model_dump(mode="json"),
+            "last_used": time.time(),
+            "hits": 0,
+        }
+        self.changed.add(key)
+        self._save()
+
+    def find_similar(self, prompt: str, workflows_dir: str = None):
+        """
+        Best trigram match among cached prompts and (optionally) saved workflows.
+        Returns (score, label, Workflow) or None when nothing clears its threshold.
+        """
+        query = trigrams(normalize_prompt(prompt))
+        candidates = []
+
+        for entry in self.entries.values():
+            score = similarity(query, trigrams(entry["normalized"]))
+            if score >= SIMILARITY_THRESHOLD:
+                candidates.append((score, f"cached: {entry['prompt']}", entry["workflow"]))
+
+        for path, data in _saved_workflows(workflows_dir):
+            score = similarity(query, trigrams(describe_workflow(data)))
+            if score >= SAVED_SIMILARITY_THRESHOLD:
+                candidates.append((score, f"saved: {path}", data))
+
+        for score, label, data in sorted(candidates, key=lambda c: c[0], reverse=True):
+            try:
+                return score, label, Workflow(**data)
+            except Exception:
+                continue  # e.g. a saved file that no longer matches the schema
+        return None
+
+
+def describe_workflow(data: dict) -> str:
+    """Text used to match a saved workflow against prompts: its name and step types."""
+    parts = [data.get("name", "").replace("_", " ")]
+    parts += [step.get("type", "").replace(".", " ").replace("_", " ") for step in data.get("steps", [])]
+    return normalize_prompt(" ".join(parts))
+
+
+def _saved_workflows(workflows_dir: str):
+    if not workflows_dir or not os.path.isdir(workflows_dir):
+        return
+    for filename in sorted(os.listdir(workflows_dir)):
+        if not filename.endswith(".json"):
+            continue
+        path = os.path.join(workflows_dir, filename)
+        try:
+            with open(path) as f:
+                yield path, json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
@@ -1,4 +1,7 @@
+import json
+import os
 from connectors.registry import REGISTRY
+from core.estimator import estimate_workflow, check_rate_limits, load_latency_stats
 
 def list_connectors():
     print("🔌 Available Connectors:\n")
@@ -7,7 +10,50 @@ def list_connectors():
         params = ", ".join(meta.get("required_params", []))
         print(f"- {step_type} → {desc} (params: {params}) \n")
 
+def estimate(paths, webhook_rate=1.0):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".json")))
+        else:
+            files.append(path)
+
+    stats = load_latency_stats()
+    combined = {}
+    for path in files:
+        with open(path) as f:
+            data = json.load(f)
+        report = estimate_workflow(data, stats=stats, webhook_rate=webhook_rate)
+
+        print(f"📊 {report['name']} ({path})")
+        for s in report["steps"]:
+            tokens = f", ~{s['tokens_in']}+{s['tokens_out']} tokens" if s["tokens_in"] else ""
+            print(f"   {s['index']}. {s['type']}: {s['requests']} req{tokens}, ~{s['latency']:.1f}s ({s['latency_source']})")
+        print(f"   → per run: {report['requests']} HTTP requests, ~{report['tokens']} LLM tokens, ~{report['wall_time']:.1f}s")
+        print(f"   → peak runs/hour: {report['runs_per_hour']:g}")
+        for warning in report["warnings"]:
+            print(f"   ⚠️ {warning}")
+        print()
+
+        for service, count in report["per_service"].items():
+            combined[service] = combined.get(service, 0) + count * report["runs_per_hour"]
+
+    if len(files) > 1:
+        print(f"🧮 Combined peak hourly load across {len(files)} workflows:")
+        for service, used in sorted(combined.items()):
+            print(f"   - {service}: ~{used:.0f}/h")
+        for warning in check_rate_limits(combined):
+            print(f"   ⚠️ {warning}")
+
 if __name__ == "__main__":
     import sys
     if sys.argv[1] == "list-connectors":
         list_connectors()
+    elif sys.argv[1] == "estimate":
+        args = sys.argv[2:]
+        webhook_rate = 1.0
+        if "--webhook-rate" in args:
+            idx = args.index("--webhook-rate")
+            webhook_rate = float(args[idx + 1])
+            del args[idx:idx + 2]
+        estimate(args or ["workflows"], webhook_rate=webhook_rate)
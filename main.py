@@ -1,5 +1,6 @@
 import os
 from core.prompt_handler import generate_workflow
+from core.workflow_cache import WorkflowCache
 from dotenv import load_dotenv
 import json
 import datetime
@@ -13,9 +14,24 @@ def prompt_for_workflow():
     user_prompt = input("> ")
 
     try:
-        wf = generate_workflow(user_prompt)
-        print("\n✅ Generated Workflow:\n")
-        print(wf.model_dump_json(indent=2))
+        cache = WorkflowCache()
+        wf = cache.get(user_prompt)
+        if wf:
+            print("\n⚡ Using cached workflow for this prompt.")
+        else:
+            match = cache.find_similar(user_prompt, workflows_dir=WORKFLOWS_DIR)
+            if match:
+                score, label, similar_wf = match
+                print(f"\n🔎 Found a similar workflow ({label}, similarity {score:.2f}):")
+                print(similar_wf.model_dump_json(indent=2))
+                if input("\n♻️ Use this workflow instead of generating a new one? (y/n): ").strip().lower() == "y":
+                    wf = similar_wf
+
+        if not wf:
+            wf = generate_workflow(user_prompt)
+            cache.put(user_prompt, wf)
+            print("\n✅ Generated Workflow:\n")
+            print(wf.model_dump_json(indent=2))
 
         save = input("\n💾 Save this workflow to file? (y/n): ").strip().lower()
         if save == "y":
@@ -1,10 +1,14 @@
-import json
 import sys
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from core.schema import Workflow
-from core.prompt_handler import sanitize_workflow_dict
+from core.plan import ExecutionPlan, compile_workflow, load_plan, render
+from core.state import StateStore, NO_CHANGES
+from core.estimator import record_step_latencies
+from core.profiling import StepProfiler
 from connectors import ai, email, notion, github, slack, api, doc, weather
-from jinja2 import Template
 
 # Maps step type to handler
 STEP_HANDLERS = {
@@ -17,82 +21,222 @@ STEP_HANDLERS = {
     "github.create_issue": github.run,
     "github.get_pr_description": github.run,
     "github.get_pr_diff": github.run,
-    "slack.send_message": slack.run,
-    "discord.send_message": slack.run,
-    "api.fetch_hacker_news": api.run,
-    "api.http_get": api.run,
+    "slack.send_message": slack.send_slack_message,
+    "discord.send_message": slack.send_discord_message,
+    "api.fetch_hacker_news": api.fetch_hacker_news,
+    "api.http_get": api.http_get,
     "weather.fetch_forecast": weather.run,
     "doc.generate_summary": doc.run,
     "doc.save_to_file": doc.run
 }
 
-def resolve_templates(obj, context):
-    if isinstance(obj, str):
-        try:
-            return Template(obj).render(context)
-        except Exception as e:
-            return f"[Template error: {e}]"
-    elif isinstance(obj, dict):
-        return {k: resolve_templates(v, context) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [resolve_templates(v, context) for v in obj]
-    else:
-        return obj
-
 def run_step(step, context):
-    step_type = step.type
-    params = resolve_templates(step.params, context)
-    print(f"\n➡️ Running step: {step_type}")
-
-    # Check static handlers first
-    if step_type in STEP_HANDLERS:
-        output = STEP_HANDLERS[step_type](params, context)
-        return output
-
-    # Check if _step_type is defined (e.g. github.query_issues)
-    step_meta_type = step.params.get("_step_type", "")
-    if "." in step_meta_type:
-        module_name = step_meta_type.split(".")[0]
+    params = render(step.params, context)
+    print(f"\n➡️ Running step: {step.type}")
+
+    if step.handler is None:
+        print(f"⚠️ Unknown step type: {step.type}")
+        return None
+    return step.handler(params, context)
+
+DEFAULT_STEP_TIMEOUT = 120  # seconds per attempt when a step doesn't declare one
+MAX_RETRY_BACKOFF = 30
+ABANDON_GRACE = 10          # seconds a timed-out attempt gets to wind down before a retry
+STEP_QUEUE_TIMEOUT = 300    # seconds to wait for a free step thread
+PROFILE_DIR = ".flowpilot_profiles"
+
+# Steps run on worker threads so a hung connector can be abandoned at its deadline.
+# The thread itself exits once its deadline-bounded HTTP/LLM timeout fires.
+step_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="flowpilot-step")
+
+class StepFailed(Exception):
+    pass
+
+class AttemptNotRetryable(Exception):
+    """An attempt failed in a way where running the step again could duplicate its effects."""
+
+def run_step_with_timeout(step, context, timeout, profiler=None):
+    cancel_event = threading.Event()
+    started = threading.Event()
+    step_context = {**context, "cancel_event": cancel_event}
+
+    def attempt():
+        # The deadline starts when a thread picks the step up, not when it's queued
+        step_context["deadline"] = time.monotonic() + timeout
+        started.set()
+        if profiler is None:
+            return run_step(step, step_context)
+        # Profile inside the worker thread, where the step actually runs
+        return profiler.run(step.index, step.type, run_step, step, step_context)
+
+    future = step_executor.submit(attempt)
+    if not started.wait(STEP_QUEUE_TIMEOUT):
+        if future.cancel():
+            raise AttemptNotRetryable(f"no step thread was free for {STEP_QUEUE_TIMEOUT}s")
+        started.wait()
+    try:
+        return future.result(timeout=max(0, step_context["deadline"] - time.monotonic()))
+    except FutureTimeout:
+        cancel_event.set()
+
+    # Let the abandoned attempt wind down (its HTTP calls are capped by the deadline)
+    # before anything retries the step, so a late POST can't race a second one.
+    try:
+        output = future.result(timeout=ABANDON_GRACE)
+    except FutureTimeout:
+        raise AttemptNotRetryable(f"timed out after {timeout}s and is still running")
+    except Exception:
+        raise TimeoutError(f"timed out after {timeout}s")
+    print(f"⚠️ Step {step.index} ({step.type}) finished after its {timeout}s timeout — keeping its output.")
+    return output
+
+def execute_step(i, step, context, profiler=None):
+    """Run a step under its timeout/retries policy. Raises StepFailed when every attempt fails."""
+    timeout = step.timeout or DEFAULT_STEP_TIMEOUT
+    attempts = step.retries + 1
+    error = None
+
+    for attempt in range(1, attempts + 1):
         try:
-            module = __import__(f"connectors.{module_name}", fromlist=["run"])
-            return module.run(params, context)
+            output = run_step_with_timeout(step, context, timeout, profiler)
+            if output is not None:
+                return output
+            error = "step returned no output"
+        except AttemptNotRetryable as e:
+            raise StepFailed(f"Step {i} ({step.type}) failed: {e}")
         except Exception as e:
-            print(f"❌ Failed to run {step_type} from connector '{module_name}': {e}")
-            return None
+            error = str(e) or e.__class__.__name__
+
+        print(f"❌ Step {i} ({step.type}) attempt {attempt}/{attempts} failed: {error}")
+        if attempt < attempts:
+            time.sleep(min(2 ** (attempt - 1), MAX_RETRY_BACKOFF))
+
+    raise StepFailed(f"Step {i} ({step.type}) failed: {error}")
+
+def run_plan_step(i, step, context, skipped, profiler=None, latencies=None):
+    """
+    Run one step with its dependencies and on_error policy applied.
+    Returns (status, output) where status is "done", "skipped" or "failed".
+    The step's wall time is appended to `latencies`; see flush_latencies().
+    """
+    blocked_by = step.dependencies & skipped
+    if blocked_by:
+        print(f"⏭️ Skipping step {i} ({step.type}): depends on skipped step(s) {sorted(blocked_by)}")
+        return "skipped", None
+
+    started = time.perf_counter()
+    try:
+        return "done", execute_step(i, step, context, profiler)
+    except StepFailed as e:
+        if step.on_error == "skip":
+            print(f"⏭️ {e} — skipping it and any steps that depend on it.")
+            return "skipped", None
+        elif step.on_error == "fallback":
+            print(f"↩️ {e} — using fallback output.")
+            return "done", render(step.fallback, context)
+        print(f"🛑 {e} — stopping workflow.")
+        return "failed", None
+    finally:
+        if latencies is not None:
+            latencies.append((step.type, time.perf_counter() - started))
+
+def flush_latencies(latencies):
+    try:
+        record_step_latencies(latencies)
+    except Exception as e:
+        # Stats only feed estimates; never let them change the run's outcome
+        print(f"⚠️ Couldn't record step latencies: {e}")
+
+def run_workflow(workflow: Workflow, profile_dir: str = None, profile_mode: str = "cprofile"):
+    profiler = StepProfiler(profile_dir, profile_mode) if profile_dir else None
+    plan = compile_workflow(workflow, STEP_HANDLERS)
+    return run_plan(plan, profiler=profiler)
 
-    print(f"⚠️ Unknown step type: {step_type}")
-    return None
+def run_plan(plan: ExecutionPlan, profiler: StepProfiler = None, on_output=None, state: StateStore = None):
+    """
+    Run a compiled plan. Pass a StepProfiler to profile every step; its output is
+    written when the run ends. `on_output(i, output, status)` is called after each step.
+    `state` defaults to the workflow's local StateStore.
+    """
+    latencies = []
+    try:
+        return _run_plan(plan, profiler, on_output, latencies, state)
+    finally:
+        # One stats write per run rather than per step
+        flush_latencies(latencies)
+        if profiler is not None:
+            profiler.finish()
 
-def run_workflow(workflow: Workflow):
-    print(f"\n🚀 Running workflow: {workflow.name}")
+def _run_plan(plan: ExecutionPlan, profiler: StepProfiler = None, on_output=None, latencies=None, state=None):
+    print(f"\n🚀 Running workflow: {plan.name}")
+    state = state if state is not None else StateStore(plan.name)
     context = {
-        "trigger": workflow.trigger.params,
-        "steps": {}
+        "trigger": render(plan.trigger_params, {}),
+        "steps": {},
+        "state": state
     }
+    skipped = set()
+
+    for i, step in enumerate(plan.steps):
+        status, output = run_plan_step(i, step, context, skipped, profiler, latencies)
+        if on_output is not None:
+            on_output(i, output, status)
+
+        if status == "failed":
+            print("⚠️ Keeping previous cursors for the next run.")
+            return False
+        if status == "skipped":
+            skipped.add(i)
+            context["steps"][i] = {"output": None}
+            continue
 
-    for i, step in enumerate(workflow.steps):
-        output = run_step(step, context)
         context["steps"][i] = {"output": output}
+        if output == NO_CHANGES:
+            print(f"⏭️ Step {i} found nothing new — skipping remaining steps.")
+            break
         print(f"✅ Step {i} output: {output}")
 
+    # Only advance cursors when nothing was skipped, so the next run retries the same items
+    if skipped:
+        print("⚠️ Some steps were skipped — keeping previous cursors for the next run.")
+    else:
+        state.save()
     print("\n🎉 Workflow complete.")
+    return True
 
 if __name__ == "__main__":
     print("🏁 Runner started")
 
-    if len(sys.argv) < 2:
-        print("Usage: python runner.py workflows/your_workflow.json")
+    args = sys.argv[1:]
+    profiler = None
+    if "--profile" in args:
+        # --profile [DIR] [--profile-mode cprofile|sample]
+        idx = args.index("--profile")
+        profile_dir = None
+        if idx + 1 < len(args) and not args[idx + 1].startswith("--") and not args[idx + 1].endswith(".json"):
+            profile_dir = args.pop(idx + 1)
+        args.pop(idx)
+        profile_mode = "cprofile"
+        if "--profile-mode" in args:
+            idx = args.index("--profile-mode")
+            profile_mode = args[idx + 1]
+            del args[idx:idx + 2]
+        profile_dir = profile_dir or os.path.join(PROFILE_DIR, time.strftime("%Y%m%d_%H%M%S"))
+        profiler = StepProfiler(profile_dir, profile_mode)
+
+    if not args:
+        print("Usage: python runner.py workflows/your_workflow.json [--profile [DIR]] [--profile-mode cprofile|sample]")
         sys.exit(1)
 
-    workflow_path = sys.argv[1]
+    workflow_path = args[0]
 
     if not os.path.exists(workflow_path):
         print(f"❌ Workflow file not found: {workflow_path}")
         sys.exit(1)
 
-    with open(workflow_path) as f:
-        raw_data = json.load(f)
-
-    sanitized = sanitize_workflow_dict(raw_data)
-    workflow = Workflow(**sanitized)
-    run_workflow(workflow)
\ No newline at end of file
+    if profiler:
+        plan = profiler.run(-1, "load_plan", load_plan, workflow_path, STEP_HANDLERS)
+    else:
+        plan = load_plan(workflow_path, STEP_HANDLERS)
+    if not run_plan(plan, profiler=profiler):
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,79 @@
+# tests/test_api.py
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from connectors import api
+
+ROUTES = {
+    "/data.json": (json.dumps({"items": [{"title": "first"}, {"title": "second"}], "total": 2}).encode(), "application/json"),
+    "/big.txt": (b"x" * 50_000, "text/plain"),
+    "/topstories.json": (json.dumps([3, 1, 2]).encode(), "application/json"),
+}
+for item_id in (1, 2, 3):
+    ROUTES[f"/item/{item_id}.json"] = (
+        json.dumps({"id": item_id, "title": f"Story {item_id}", "url": f"https://example.com/{item_id}"}).encode(),
+        "application/json",
+    )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ROUTES:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body, content_type = ROUTES[self.path]
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_http_get_decodes_gzip_json(base_url):
+    assert api.http_get({"url": f"{base_url}/data.json"})["total"] == 2
+
+
+def test_http_get_extracts_json_paths(base_url):
+    result = api.http_get({"url": f"{base_url}/data.json", "json_paths": ["items.1.title", "missing.key"]})
+    assert result == {"items.1.title": "second", "missing.key": None}
+
+
+def test_http_get_enforces_max_bytes(base_url):
+    assert api.http_get({"url": f"{base_url}/big.txt", "max_bytes": 1000}) is None
+
+
+def test_http_get_streams_to_file(base_url, tmp_path):
+    target = tmp_path / "big.txt"
+    assert api.http_get({"url": f"{base_url}/big.txt", "save_to": str(target)}) == str(target)
+    assert target.read_bytes() == b"x" * 50_000
+
+
+def test_http_get_non_200_returns_none(base_url):
+    assert api.http_get({"url": f"{base_url}/nope"}) is None
+
+
+def test_fetch_hacker_news_keeps_ranking_order(base_url):
+    output = api.fetch_hacker_news({"limit": 3, "base_url": base_url})
+    assert [line.split(" (")[0] for line in output.splitlines()] == ["- Story 3", "- Story 1", "- Story 2"]
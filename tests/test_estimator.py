@@ -0,0 +1,49 @@
+# tests/test_estimator.py
+from core.estimator import estimate_workflow, runs_per_hour
+
+
+def test_estimate_counts_requests_tokens_and_rate_limits():
+    data = {
+        "name": "hn_digest",
+        "trigger": {"type": "scheduler.cron", "params": {"expression": "*/2 * * * *"}},
+        "steps": [
+            {"type": "api.fetch_hacker_news", "params": {"limit": 20}},
+            {"type": "ai.summarize", "params": {"text": "{{ steps.0.output }}"}},
+            {"type": "slack.send_message", "params": {"channel": "news", "message": "{{ steps.1.output }}"}},
+        ],
+    }
+    report = estimate_workflow(data, stats={"slack.send_message": [2.0, 4.0]})
+
+    assert [s["requests"] for s in report["steps"]] == [21, 1, 1]
+    assert report["steps"][1]["tokens_in"] > 1200 // 4
+    assert report["steps"][2]["latency"] == 3.0 and report["steps"][2]["latency_source"] == "history"
+    assert report["runs_per_hour"] == 30
+    assert report["per_service"]["hacker_news"] == 21
+    assert report["warnings"] == []
+
+
+def test_templated_limit_falls_back_to_default_cost():
+    data = {"steps": [{"type": "api.fetch_hacker_news", "params": {"limit": "{{ trigger.count }}"}}]}
+    assert estimate_workflow(data, stats={})["requests"] == 11
+
+
+def test_runs_per_hour():
+    assert runs_per_hour({"type": "scheduler", "event": "cron", "params": {"expression": "0,30 9 * * *"}}) == 2
+    assert runs_per_hour({"type": "scheduler", "params": {"expression": "10-19/5 * * * *"}}) == 2
+    assert runs_per_hour({"type": "webhook", "event": "receive"}, webhook_rate=12) == 12
+    # Unparseable minute fields don't crash the estimate
+    assert runs_per_hour({"type": "scheduler", "params": {"expression": "*/0 * * * *"}}) == 1
+    assert runs_per_hour({"type": "scheduler", "params": {"expression": "{{ minute }} * * * *"}}) == 1
+
+
+def test_busy_webhook_is_flagged_for_rate_limits():
+    data = {
+        "trigger": {"type": "webhook", "event": "receive", "params": {}},
+        "steps": [
+            {"type": "slack.send_message", "params": {"channel": "a", "message": "hi"}},
+            {"type": "slack.send_message", "params": {"channel": "b", "message": "hi"}},
+        ],
+    }
+    report = estimate_workflow(data, stats={}, webhook_rate=2000)
+    assert report["warnings"] == ["slack: ~4000/h exceeds limit of 3600/h"]
+    assert estimate_workflow(data, stats={}, webhook_rate=1000)["warnings"] == []
@@ -0,0 +1,75 @@
+# tests/test_github.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from connectors import github
+from core.state import NO_CHANGES, StateStore
+
+issues = {}
+requests_seen = []
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        requests_seen.append(query)
+        since = query.get("since", "")
+        matching = sorted((i for i in issues.values() if i["updated_at"] >= since), key=lambda i: i["updated_at"])
+        page = int(query.get("page", 1))
+        body = json.dumps(matching[(page - 1) * 2:page * 2]).encode()  # two per page
+        self.send_response(200)
+        if page * 2 < len(matching):
+            next_url = f"http://127.0.0.1:{self.server.server_port}{url.path}?page={page + 1}&since={since}"
+            self.send_header("Link", f'<{next_url}>; rel="next"')
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def base_url(monkeypatch):
+    issues.clear()
+    requests_seen.clear()
+    monkeypatch.setattr(github, "SecretsManager", lambda: {"GITHUB_TOKEN": "test"})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def issue(number, updated_at, state="open", **extra):
+    issues[number] = {"number": number, "title": f"Issue {number}", "body": "", "state": state,
+                      "updated_at": updated_at, **extra}
+
+
+def query(base_url, tmp_path):
+    store = StateStore("issues", state_dir=str(tmp_path))
+    params = {"_step_type": "github.query_issues", "repo": "acme/app", "incremental": True, "api_base": base_url}
+    result = github.run(params, {"state": store})
+    store.save()
+    return result
+
+
+def test_incremental_query_pages_through_changes_only(base_url, tmp_path):
+    issue(1, "2024-01-01T00:00:00Z")
+    issue(2, "2024-01-02T00:00:00Z", pull_request={})
+    issue(3, "2024-01-03T00:00:00Z")
+    assert query(base_url, tmp_path) == "- #1: Issue 1\n- #3: Issue 3"
+    assert len(requests_seen) == 2  # followed the Link header
+    assert requests_seen[0] == {"state": "all", "sort": "updated", "direction": "asc", "per_page": "100"}
+
+    requests_seen.clear()
+    assert query(base_url, tmp_path) == NO_CHANGES
+    assert requests_seen[0]["since"] == "2024-01-03T00:00:00Z"
+
+    issue(3, "2024-01-04T00:00:00Z", state="closed")
+    assert query(base_url, tmp_path) == "- #3: Issue 3 (closed)"
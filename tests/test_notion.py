@@ -0,0 +1,70 @@
+# tests/test_notion.py
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from connectors import notion
+from core.state import NO_CHANGES, StateStore
+
+pages = []
+bodies = []
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        bodies.append(body)
+        since = body.get("filter", {}).get("last_edited_time", {}).get("on_or_after", "")
+        matching = [p for p in pages if p["last_edited_time"] >= since]
+        start = int(body.get("start_cursor") or 0)
+        results = matching[start:start + 1]  # one page per response
+        has_more = start + 1 < len(matching)
+        data = json.dumps({"results": results, "has_more": has_more,
+                           "next_cursor": str(start + 1) if has_more else None}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def base_url(monkeypatch):
+    pages.clear()
+    bodies.clear()
+    monkeypatch.setattr(notion, "SecretsManager", lambda: {"NOTION_TOKEN": "test"})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def page(page_id, title, edited):
+    return {"id": page_id, "url": f"https://notion.so/{page_id}", "last_edited_time": edited, "archived": False,
+            "properties": {"Name": {"type": "title", "title": [{"plain_text": title}]}}}
+
+
+def query(base_url, tmp_path):
+    store = StateStore("tasks", state_dir=str(tmp_path))
+    params = {"_step_type": "notion.query_database", "database_id": "db1", "incremental": True, "api_base": base_url}
+    result = notion.run(params, {"state": store})
+    store.save()
+    return result
+
+
+def test_incremental_query_returns_only_edited_pages(base_url, tmp_path):
+    pages.extend([page("a", "Alpha", "2024-01-01T00:00:00Z"), page("b", "Beta", "2024-01-02T00:00:00Z")])
+    assert query(base_url, tmp_path) == "- Alpha (https://notion.so/a)\n- Beta (https://notion.so/b)"
+    assert len(bodies) == 2 and bodies[1]["start_cursor"] == "1"
+
+    # A page re-read at the cursor boundary without edits isn't reported again
+    assert query(base_url, tmp_path) == NO_CHANGES
+    assert bodies[-1]["filter"]["last_edited_time"] == {"on_or_after": "2024-01-02T00:00:00Z"}
+
+    pages[1] = page("b", "Beta v2", "2024-01-03T00:00:00Z")
+    assert query(base_url, tmp_path) == "- Beta v2 (https://notion.so/b)"
@@ -0,0 +1,76 @@
+# tests/test_plan.py
+import copy
+import json
+import os
+
+import pytest
+
+from connectors import email, weather
+from core.plan import load_plan, render
+
+HANDLERS = {"email.send": email.run, "weather.fetch_forecast": weather.run}
+
+workflow = {
+    "type": "workflow",
+    "name": "weather_to_email",
+    "trigger": {"type": "scheduler", "event": "cron", "params": {"expression": "0 9 * * *"}},
+    "steps": [
+        {"type": "weather.fetch_forecast", "params": {"location": "New Jersey"}},
+        {"type": "email.send", "params": {
+            "to": "me@example.com",
+            "subject": "Weather",
+            "body": "Today: {{ steps.0.output }}",
+        }, "on_error": "skip"},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def openai_key(monkeypatch):
+    # Compiling on a cache miss imports core.prompt_handler, which builds the OpenAI client
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+
+def test_plan_is_compiled_once_and_reloaded_from_cache(tmp_path):
+    path = tmp_path / "weather_to_email.json"
+    path.write_text(json.dumps(workflow))
+    cache_dir = str(tmp_path / "plans")
+
+    compiled = load_plan(str(path), HANDLERS, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    cached = load_plan(str(path), HANDLERS, cache_dir=cache_dir)
+
+    context = {"steps": {0: {"output": "sunny"}}}
+    for plan in (compiled, cached):
+        step = plan.steps[1]
+        assert step.handler is email.run
+        assert step.dependencies == {0}
+        assert step.on_error == "skip"
+        assert render(step.params, context)["body"] == "Today: sunny"
+
+
+def test_changed_file_gets_a_new_plan(tmp_path):
+    path = tmp_path / "weather_to_email.json"
+    cache_dir = str(tmp_path / "plans")
+    path.write_text(json.dumps(workflow))
+    load_plan(str(path), HANDLERS, cache_dir=cache_dir)
+
+    changed = copy.deepcopy(workflow)
+    changed["steps"][0]["params"]["location"] = "Boston"
+    path.write_text(json.dumps(changed))
+    plan = load_plan(str(path), HANDLERS, cache_dir=cache_dir)
+
+    assert plan.steps[0].params["location"] == "Boston"
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_remapped_handler_gets_a_new_plan(tmp_path):
+    path = tmp_path / "weather_to_email.json"
+    cache_dir = str(tmp_path / "plans")
+    path.write_text(json.dumps(workflow))
+    load_plan(str(path), HANDLERS, cache_dir=cache_dir)
+
+    plan = load_plan(str(path), {**HANDLERS, "email.send": weather.run}, cache_dir=cache_dir)
+
+    assert plan.steps[1].handler is weather.run
+    assert len(os.listdir(cache_dir)) == 2
@@ -0,0 +1,49 @@
+# tests/test_profiling.py
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from core.profiling import StepProfiler
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "sample"])
+def test_profiles_are_written_on_finish(tmp_path, mode):
+    profiler = StepProfiler(str(tmp_path), mode=mode, interval=0.001)
+    assert profiler.run(0, "ai.summarize", busy, 200_000) == busy(200_000)
+    profiler.run(0, "ai.summarize", busy, 10)
+    profiler.finish()
+
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["mode"] == mode
+    assert [s["step"] for s in summary["steps"]] == ["step_0_ai.summarize", "step_0_ai.summarize_attempt2"]
+    assert (tmp_path / "collapsed.txt").read_text().startswith("step_0_ai.summarize")
+    assert not tracemalloc.is_tracing()
+
+
+def test_unfinished_calls_are_reported_as_timed_out(tmp_path):
+    profiler = StepProfiler(str(tmp_path))
+    started, release = threading.Event(), threading.Event()
+
+    def hung():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=profiler.run, args=(1, "api.http_get", hung))
+    thread.start()
+    started.wait(5)
+    profiler.run(2, "email.send", busy, 10)
+    assert tracemalloc.is_tracing()  # still held by the hung call
+
+    profiler.finish(timeout=0.1)
+    steps = json.loads((tmp_path / "summary.json").read_text())["steps"]
+    assert {s["step"]: s.get("status") for s in steps} == {"step_2_email.send": None, "step_1_api.http_get": "timed_out"}
+
+    release.set()
+    thread.join()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,80 @@
+# tests/test_prompt_handler.py
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def reply(workflow: dict):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(workflow)))])
+
+
+class FakeCompletions:
+    """Stands in for AsyncOpenAI's chat.completions; answers each prompt from `replies`."""
+
+    def __init__(self, replies: dict):
+        self.replies = replies
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, messages, **kwargs):
+        prompt = messages[-1]["content"].split("User: ")[-1].split("\nJSON:")[0]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        # Finish out of order so result ordering is actually exercised
+        await asyncio.sleep(0.01 * (len(prompt) % 3))
+        self.in_flight -= 1
+        if prompt not in self.replies:
+            raise RuntimeError("upstream error")
+        return reply(self.replies[prompt])
+
+
+@pytest.fixture
+def prompt_handler(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return importlib.import_module("core.prompt_handler")
+
+
+def weather_workflow(location: str) -> dict:
+    return {
+        "type": "workflow",
+        "name": f"weather_{location}",
+        "trigger": {"type": "scheduler.cron", "params": {"expression": "0 9 * * *"}},
+        "steps": [{"type": "weather.fetch_forecast", "params": {"location": location}}],
+    }
+
+
+def test_drafts_keep_prompt_order_and_respect_concurrency(prompt_handler, monkeypatch):
+    prompts = [f"weather {i}" for i in range(8)]
+    completions = FakeCompletions({p: weather_workflow(str(i)) for i, p in enumerate(prompts)})
+    monkeypatch.setattr(prompt_handler, "async_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    drafts = asyncio.run(prompt_handler.generate_workflows_async(prompts + ["unknown"], max_concurrency=3))
+
+    assert [d.prompt for d in drafts] == prompts + ["unknown"]
+    assert [d.to_workflow().name for d in drafts[:-1]] == [f"weather_{i}" for i in range(8)]
+    assert drafts[-1].error.startswith("Generation failed")
+    assert completions.peak == 3
+
+
+def test_missing_parameters_are_reported_as_gaps(prompt_handler, monkeypatch):
+    workflow = {
+        "type": "workflow",
+        "name": "summary_to_notion",
+        "steps": [
+            {"type": "weather.fetch_forecast", "params": {}},
+            {"type": "notion.create_page", "params": {"parent_id": "notion_parent_id", "title": "Weather"}},
+        ],
+    }
+    completions = FakeCompletions({"weather to notion": workflow})
+    monkeypatch.setattr(prompt_handler, "async_client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr("builtins.input", lambda *_: pytest.fail("drafts must never prompt on stdin"))
+
+    [draft] = asyncio.run(prompt_handler.generate_workflows_async(["weather to notion"]))
+
+    assert draft.error is None and not draft.is_complete
+    assert [(g.step_index, g.param) for g in draft.gaps] == [
+        (None, "trigger"), (0, "location"), (1, "parent_id"), (1, "parent_type"),
+    ]
@@ -0,0 +1,83 @@
+# tests/test_queue.py
+import time
+
+import pytest
+
+from core.queue import Broker, SqliteQueue
+
+
+def test_job_is_claimed_by_one_worker_at_a_time(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue("workflow", {"run_id": "r1"})
+
+    job = queue.claim("worker-a")
+    assert job.id == job_id and job.payload == {"run_id": "r1"} and job.attempts == 1
+    assert queue.claim("worker-b") is None
+
+    queue.complete(job_id, "worker-a")
+    assert queue.job_status(job_id) == "done"
+    assert queue.claim("worker-b") is None
+
+
+def test_expired_lease_is_reclaimed_and_old_worker_loses_heartbeat(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue("step", {"step_index": 0})
+
+    queue.claim("worker-a", lease_seconds=0.05)
+    time.sleep(0.1)
+    job = queue.claim("worker-b", lease_seconds=30)
+
+    assert job.id == job_id and job.attempts == 2
+    assert queue.heartbeat(job_id, "worker-a") is False
+    assert queue.heartbeat(job_id, "worker-b") is True
+
+
+def test_failed_job_is_requeued_until_max_attempts(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue("workflow", {}, max_attempts=2)
+
+    queue.claim("worker-a")
+    queue.fail(job_id, "worker-a", "boom")
+    assert queue.job_status(job_id) == "queued"
+
+    queue.claim("worker-a")
+    queue.fail(job_id, "worker-a", "boom again")
+    assert queue.job_status(job_id) == "failed"
+
+
+def test_enqueue_with_same_id_is_idempotent_and_results_are_shared(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("step", {"step_index": 1}, job_id="run:1")
+    queue.enqueue("step", {"step_index": 1}, job_id="run:1")
+    assert queue.claim("worker-a").id == "run:1"
+    assert queue.claim("worker-b") is None
+
+    queue.create_run("run", "weather_to_email", "steps")
+    queue.put("run", 0, {"temp": 71})
+    other_node = SqliteQueue(str(tmp_path / "queue.db"))
+    assert other_node.get_run("run")["steps"] == {0: {"output": {"temp": 71}, "status": "done", "state": {}}}
+
+
+def test_run_fails_when_its_job_gives_up(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "queue.db"))
+    queue.create_run("r1", "weather_to_email", "workflow")
+    failing = queue.enqueue("workflow", {"run_id": "r1"}, max_attempts=1)
+    queue.claim("worker-a")
+    queue.fail(failing, "worker-a", "boom")
+    assert queue.get_run("r1")["status"] == "failed" and queue.get_run("r1")["error"] == "boom"
+
+    queue.create_run("r2", "weather_to_email", "steps")
+    queue.enqueue("step", {"run_id": "r2", "step_index": 0}, max_attempts=1)
+    queue.claim("worker-a", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert queue.claim("worker-b") is None
+    assert queue.get_run("r2")["status"] == "failed"
+
+
+def test_half_implemented_broker_fails_at_construction():
+    class EnqueueOnly(Broker):
+        def enqueue(self, kind, payload, job_id=None, max_attempts=3):
+            return "job"
+
+    with pytest.raises(TypeError):
+        EnqueueOnly()
@@ -0,0 +1,166 @@
+# tests/test_runner.py
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from core.plan import compile_workflow
+from core.schema import Workflow
+from core.utils import StepCancelled
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)  # state and latency stats land in tmp_path
+    runner = importlib.import_module("runner")
+    monkeypatch.setattr(runner.time, "sleep", lambda _: None)  # no retry backoff
+    return runner
+
+
+def make_plan(steps, handlers):
+    workflow = Workflow(**{
+        "type": "workflow",
+        "name": "policy_test",
+        "trigger": {"type": "webhook", "event": "receive", "params": {}},
+        "steps": steps,
+    })
+    return compile_workflow(workflow, handlers)
+
+
+def test_timed_out_step_is_retried_once_the_abandoned_attempt_stops(runner):
+    calls = []
+    stopped = threading.Event()
+
+    def flaky(params, context):
+        calls.append(stopped.is_set())
+        if len(calls) == 1:
+            # Hangs past its deadline, then gives up like request_timeout() would
+            context["cancel_event"].wait(5)
+            stopped.set()
+            raise StepCancelled("Step deadline exceeded")
+        return "forecast"
+
+    plan = make_plan([{"type": "weather.fetch_forecast", "params": {}, "timeout": 0.2, "retries": 1}],
+                     {"weather.fetch_forecast": flaky})
+    outputs = []
+    assert runner.run_plan(plan, on_output=lambda i, output, status: outputs.append((output, status)))
+    assert calls == [False, True]  # the retry only started after the first attempt ended
+    assert outputs == [("forecast", "done")]
+
+
+def test_late_success_is_kept_instead_of_retried(runner):
+    calls = []
+
+    def slow_post(params, context):
+        calls.append(1)
+        threading.Event().wait(0.3)  # finishes its POST after the 0.1s deadline
+        return "posted"
+
+    plan = make_plan([{"type": "slack.send_message", "params": {}, "timeout": 0.1, "retries": 2}],
+                     {"slack.send_message": slow_post})
+    assert runner.run_plan(plan)
+    assert calls == [1]
+
+
+def test_attempt_that_will_not_stop_is_not_retried(runner, monkeypatch):
+    monkeypatch.setattr(runner, "ABANDON_GRACE", 0.1)
+    calls = []
+    release = threading.Event()
+
+    def stuck(params, context):
+        calls.append(1)
+        release.wait(5)  # ignores its deadline entirely
+        return "posted"
+
+    plan = make_plan([{"type": "slack.send_message", "params": {}, "timeout": 0.1, "retries": 2}],
+                     {"slack.send_message": stuck})
+    assert runner.run_plan(plan) is False
+    release.set()
+    assert calls == [1]
+
+
+def test_deadline_starts_when_a_thread_picks_the_step_up(runner, monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(runner, "step_executor", executor)
+    busy = threading.Event()
+    executor.submit(busy.wait, 0.4)  # the only thread is taken for longer than the step's timeout
+
+    plan = make_plan([{"type": "weather.fetch_forecast", "params": {}, "timeout": 0.3}],
+                     {"weather.fetch_forecast": lambda p, c: "sunny"})
+    assert runner.run_plan(plan)
+    executor.shutdown()
+
+
+def test_failing_step_stops_the_run(runner):
+    calls = []
+
+    def broken(params, context):
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    plan = make_plan([
+        {"type": "weather.fetch_forecast", "params": {}, "retries": 2},
+        {"type": "email.send", "params": {}},
+    ], {"weather.fetch_forecast": broken, "email.send": lambda p, c: pytest.fail("must not run")})
+    assert runner.run_plan(plan) is False
+    assert len(calls) == 3
+
+
+def test_skipped_step_skips_its_dependents(runner):
+    ran = []
+    plan = make_plan([
+        {"type": "weather.fetch_forecast", "params": {}, "on_error": "skip"},
+        {"type": "email.send", "params": {"body": "{{ steps.0.output }}"}},
+        {"type": "slack.send_message", "params": {"message": "independent"}},
+    ], {
+        "weather.fetch_forecast": lambda p, c: None,
+        "email.send": lambda p, c: ran.append("email") or "sent",
+        "slack.send_message": lambda p, c: ran.append("slack") or "posted",
+    })
+    outputs = []
+    assert runner.run_plan(plan, on_output=lambda i, output, status: outputs.append(status))
+    assert outputs == ["skipped", "skipped", "done"]
+    assert ran == ["slack"]
+
+
+def test_fallback_output_is_rendered_for_dependents(runner):
+    bodies = []
+    plan = make_plan([
+        {"type": "weather.fetch_forecast", "params": {"location": "Oslo"}, "on_error": "fallback",
+         "fallback": "no forecast for {{ trigger.city }}"},
+        {"type": "email.send", "params": {"body": "{{ steps.0.output }}"}},
+    ], {
+        "weather.fetch_forecast": lambda p, c: None,
+        "email.send": lambda p, c: bodies.append(p["body"]) or "sent",
+    })
+    plan = plan._replace(trigger_params={"city": "Oslo"})
+    assert runner.run_plan(plan)
+    assert bodies == ["no forecast for Oslo"]
+
+
+def test_fallback_policy_requires_a_fallback_value():
+    with pytest.raises(ValidationError):
+        make_plan([{"type": "weather.fetch_forecast", "params": {}, "on_error": "fallback"}], {})
+
+
+def test_stats_write_failure_does_not_fail_the_step(runner, monkeypatch):
+    def broken_stats(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(runner, "record_step_latencies", broken_stats)
+    plan = make_plan([{"type": "weather.fetch_forecast", "params": {}}], {"weather.fetch_forecast": lambda p, c: "sunny"})
+    assert runner.run_plan(plan)
+
+
+def test_latencies_are_written_once_per_run(runner, monkeypatch):
+    writes = []
+    monkeypatch.setattr(runner, "record_step_latencies", lambda samples: writes.append([t for t, _ in samples]))
+    plan = make_plan([
+        {"type": "weather.fetch_forecast", "params": {}},
+        {"type": "email.send", "params": {}},
+    ], {"weather.fetch_forecast": lambda p, c: "sunny", "email.send": lambda p, c: "sent"})
+    assert runner.run_plan(plan)
+    assert writes == [["weather.fetch_forecast", "email.send"]]
@@ -0,0 +1,145 @@
+# tests/test_slack.py
+import json
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from connectors import slack
+
+received = []
+discord_calls = {"count": 0}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/chat.postMessage":
+            received.append(body)
+            self._reply(200, {"ok": True, "ts": f"{len(received)}.000"})
+        elif self.path == "/discord":
+            discord_calls["count"] += 1
+            if discord_calls["count"] == 1:
+                self._reply(429, {"retry_after": 0.05})
+            else:
+                received.append(body)
+                self._reply(204, None)
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def base_url(monkeypatch):
+    received.clear()
+    slack.queues.clear()
+    monkeypatch.setattr(slack, "SLACK_MIN_INTERVAL", 0.2)
+    monkeypatch.setattr(slack, "_slack_token", lambda: "xoxb-test")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_burst_to_one_channel_is_coalesced(base_url):
+    def send(n):
+        slack.send_slack_message({"channel": "alerts", "message": f"alert {n}", "api_base": f"{base_url}/api"})
+
+    threads = [threading.Thread(target=send, args=(n,)) for n in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(received) < 10
+    delivered = "\n".join(body["text"] for body in received).splitlines()
+    assert sorted(delivered) == sorted(f"alert {n}" for n in range(10))
+
+
+def test_thread_mode_replies_to_first_message_of_burst(base_url):
+    def send(n):
+        slack.send_slack_message({"channel": "ops", "message": f"event {n}", "batch_mode": "thread",
+                                  "api_base": f"{base_url}/api"})
+
+    threads = [threading.Thread(target=send, args=(n,)) for n in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert "thread_ts" not in received[0]
+    assert all(body["thread_ts"] == "1.000" for body in received[1:])
+
+
+def test_discord_retries_after_429(base_url):
+    result = slack.send_discord_message({"webhook_url": f"{base_url}/discord", "content": "deploy finished"})
+    assert result == "Message sent to Discord webhook"
+    assert received == [{"content": "deploy finished"}]
+
+
+def test_long_message_is_split_into_several_posts(base_url, monkeypatch):
+    monkeypatch.setattr(slack, "SLACK_MAX_CHARS", 50)
+    lines = [f"line {n:02d} " + "x" * 20 for n in range(6)]
+    slack.send_slack_message({"channel": "long", "message": "\n".join(lines), "api_base": f"{base_url}/api"})
+
+    assert len(received) > 1
+    assert all(len(body["text"]) <= 50 for body in received)
+    assert "\n".join(body["text"] for body in received).splitlines() == lines
+
+
+def test_timed_out_message_is_dropped_and_queue_keeps_working(base_url):
+    calls = []
+
+    def send(text, _):
+        calls.append(text)
+        if text == "explode":
+            raise ValueError("bad payload")
+        return None, 0.0
+
+    queue = slack.ChannelQueue(send, min_interval=0.3, max_chars=100)
+    queue.submit("first").result(timeout=1)
+    with pytest.raises(TimeoutError):
+        slack._wait_for(queue.submit("abandoned"), {"deadline": slack.time.monotonic() + 0.05})
+    with pytest.raises(ValueError):
+        queue.submit("explode").result(timeout=2)
+    assert queue.submit("after").result(timeout=2) is None
+    assert calls == ["first", "explode", "after"]
+
+
+def test_idle_queue_retires_its_thread(base_url, monkeypatch):
+    monkeypatch.setattr(slack, "QUEUE_IDLE_TIMEOUT", 0.1)
+    slack.send_slack_message({"channel": "quiet", "message": "one", "api_base": f"{base_url}/api"})
+    worker = slack.queues[f"slack:{base_url}/api:quiet"].worker
+    worker.join(timeout=2)
+
+    assert not worker.is_alive() and slack.queues == {}
+    slack.send_slack_message({"channel": "quiet", "message": "two", "api_base": f"{base_url}/api"})
+    assert [body["text"] for body in received] == ["one", "two"]
+
+
+def test_only_senders_in_the_failed_post_fail():
+    posts = []
+
+    def send(text, _):
+        if posts:
+            raise RuntimeError("second post rejected")
+        posts.append(text)
+        return "ts", 0.0
+
+    queue = slack.ChannelQueue(send, min_interval=0, max_chars=10)
+    first, second = Future(), Future()
+    with pytest.raises(RuntimeError):
+        queue._deliver([("short", False, first), ("much longer text", False, second)])
+
+    assert posts == ["short"]
+    assert first.result(timeout=0) == "ts"
+    assert not second.done()  # left for the queue loop to fail
@@ -0,0 +1,59 @@
+# tests/test_state.py
+import json
+import threading
+
+from core.state import StateStore
+
+
+def test_filter_changed_only_returns_new_or_edited_items(tmp_path):
+    store = StateStore("polling", state_dir=str(tmp_path))
+    issues = [{"number": 1, "title": "a", "updated_at": "t1"}, {"number": 2, "title": "b", "updated_at": "t1"}]
+    assert store.filter_changed("issues", issues, id_of=lambda i: i["number"], fields=["title"]) == issues
+    store.save()
+
+    store = StateStore("polling", state_dir=str(tmp_path))
+    issues = [
+        {"number": 1, "title": "a", "updated_at": "t2"},   # only the timestamp moved
+        {"number": 2, "title": "b2", "updated_at": "t2"},  # edited
+        {"number": 3, "title": "c", "updated_at": "t2"},   # new
+    ]
+    changed = store.filter_changed("issues", issues, id_of=lambda i: i["number"], fields=["title"])
+    assert [i["number"] for i in changed] == [2, 3]
+
+
+def test_unsaved_updates_are_not_persisted(tmp_path):
+    store = StateStore("polling", state_dir=str(tmp_path))
+    store.set("since", "2024-01-01T00:00:00Z")
+    assert StateStore("polling", state_dir=str(tmp_path)).get("since") is None
+
+
+def test_concurrent_saves_never_leave_a_partial_file(tmp_path):
+    def save(n):
+        store = StateStore("polling", state_dir=str(tmp_path))
+        store.set("since", n)
+        store.set("payload", "x" * 10_000)
+        store.save()
+
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert json.loads((tmp_path / "polling.json").read_text())["since"] in range(20)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_saves_from_two_runs_keep_both_updates(tmp_path):
+    first = StateStore("polling", state_dir=str(tmp_path))
+    second = StateStore("polling", state_dir=str(tmp_path))
+    first.set("github:since", "t1")
+    first.filter_changed("hashes", [{"number": 1}], id_of=lambda i: i["number"])
+    second.set("notion:since", "t2")
+    second.filter_changed("hashes", [{"number": 2}], id_of=lambda i: i["number"])
+    first.save()
+    second.save()
+
+    store = StateStore("polling", state_dir=str(tmp_path))
+    assert store.get("github:since") == "t1" and store.get("notion:since") == "t2"
+    assert set(store.get("hashes")) == {"1", "2"}
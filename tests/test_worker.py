@@ -0,0 +1,105 @@
+# tests/test_worker.py
+import importlib
+import json
+
+import pytest
+
+from core.state import NO_CHANGES, StateStore
+
+workflow = {
+    "type": "workflow",
+    "name": "issues_digest",
+    "trigger": {"type": "webhook", "event": "receive", "params": {}},
+    "steps": [
+        {"type": "weather.fetch_forecast", "params": {"location": "Oslo"}},
+        {"type": "email.send", "params": {"to": "me@example.com", "subject": "Digest", "body": "static"}},
+        {"type": "slack.send_message", "params": {"channel": "news", "message": "{{ steps.0.output }}"}},
+    ],
+}
+
+
+@pytest.fixture
+def worker(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)  # plan cache, state and queue land in tmp_path
+    return importlib.import_module("worker")
+
+
+def run_steps(worker, monkeypatch, tmp_path, handlers, steps=None):
+    for step_type, handler in handlers.items():
+        monkeypatch.setitem(worker.STEP_HANDLERS, step_type, handler)
+    path = tmp_path / "workflow.json"
+    path.write_text(json.dumps({**workflow, "steps": steps or workflow["steps"]}))
+    queue = worker.SqliteQueue(str(tmp_path / "queue.db"))
+    run_id = worker.enqueue_workflow(queue, str(path), distribute_steps=True)
+    return queue, run_id
+
+
+def test_steps_run_in_order_and_cursors_save_when_run_completes(worker, monkeypatch, tmp_path):
+    calls = []
+
+    def fetch(params, context):
+        calls.append(0)
+        assert context["state"].get("cursor") == "2024-01-01"  # shared by every node
+        context["state"].set("cursor", "2024-01-02")
+        return "sunny"
+
+    def notify(params, context):
+        calls.append(2)
+        assert queue.load_state("issues_digest")["cursor"] == "2024-01-01"  # not saved mid-run
+        return "posted"
+
+    queue, run_id = run_steps(worker, monkeypatch, tmp_path, {
+        "weather.fetch_forecast": fetch,
+        "email.send": lambda p, c: calls.append(1) or "sent",
+        "slack.send_message": notify,
+    })
+    queue.save_state("issues_digest", {"cursor": "2024-01-01"})
+    assert queue.job_status(f"{run_id}:1") is None  # step 1 references nothing but still waits
+
+    worker.Worker(queue).run_forever(exit_when_idle=True)
+
+    assert calls == [0, 1, 2]
+    assert queue.get_run(run_id)["status"] == "done"
+    assert queue.load_state("issues_digest") == {"cursor": "2024-01-02"}
+    assert StateStore("issues_digest").get("cursor") is None  # nothing in the node's local folder
+
+
+def test_no_changes_ends_the_run(worker, monkeypatch, tmp_path):
+    queue, run_id = run_steps(worker, monkeypatch, tmp_path, {
+        "weather.fetch_forecast": lambda p, c: NO_CHANGES,
+        "email.send": lambda p, c: pytest.fail("must not run"),
+        "slack.send_message": lambda p, c: pytest.fail("must not run"),
+    })
+    worker.Worker(queue).run_forever(exit_when_idle=True)
+
+    run = queue.get_run(run_id)
+    assert run["status"] == "done" and list(run["steps"]) == [0]
+
+
+def test_parallel_steps_start_without_waiting(worker, monkeypatch, tmp_path):
+    steps = [dict(step) for step in workflow["steps"]]
+    steps[1]["parallel"] = True
+    queue, run_id = run_steps(worker, monkeypatch, tmp_path, {}, steps=steps)
+
+    assert queue.job_status(f"{run_id}:0") == "queued"
+    assert queue.job_status(f"{run_id}:1") == "queued"
+    assert queue.job_status(f"{run_id}:2") is None
+
+
+def test_workflow_jobs_use_shared_cursors(worker, monkeypatch, tmp_path):
+    def fetch(params, context):
+        context["state"].set("cursor", context["state"].get("cursor", 0) + 1)
+        return "sunny"
+
+    for step_type, handler in {"weather.fetch_forecast": fetch, "email.send": lambda p, c: "sent",
+                               "slack.send_message": lambda p, c: "posted"}.items():
+        monkeypatch.setitem(worker.STEP_HANDLERS, step_type, handler)
+    path = tmp_path / "workflow.json"
+    path.write_text(json.dumps(workflow))
+    queue = worker.SqliteQueue(str(tmp_path / "queue.db"))
+    for _ in range(2):
+        worker.enqueue_workflow(queue, str(path))
+        worker.Worker(queue).run_forever(exit_when_idle=True)
+
+    assert queue.load_state("issues_digest") == {"cursor": 2}
@@ -0,0 +1,54 @@
+# tests/test_workflow_cache.py
+from core.schema import Workflow
+from core.workflow_cache import WorkflowCache, normalize_prompt
+
+workflow = Workflow(**{
+    "type": "workflow",
+    "name": "weather_to_email",
+    "trigger": {"type": "scheduler", "event": "cron", "params": {"expression": "0 9 * * *"}},
+    "steps": [
+        {"type": "weather.fetch_forecast", "params": {"location": "New Jersey"}},
+        {"type": "email.send", "params": {"to": "me@example.com", "subject": "Weather", "body": "{{ steps.0.output }}"}},
+    ],
+})
+
+
+def test_normalized_prompts_share_a_cache_entry(tmp_path):
+    cache = WorkflowCache(path=str(tmp_path / "cache.json"))
+    cache.put("Email me the weather in New Jersey", workflow)
+
+    reloaded = WorkflowCache(path=str(tmp_path / "cache.json"))
+    assert normalize_prompt("email me the WEATHER in new jersey!") == normalize_prompt("Email me the weather in New Jersey")
+    assert reloaded.get("email me the WEATHER in new jersey!").name == "weather_to_email"
+    assert reloaded.get("Post the weather to Slack") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = WorkflowCache(path=str(tmp_path / "cache.json"), max_entries=2)
+    cache.put("first prompt", workflow)
+    cache.put("second prompt", workflow)
+    cache.get("first prompt")
+    cache.put("third prompt", workflow)
+    assert cache.get("second prompt") is None
+    assert cache.get("first prompt") is not None
+
+
+def test_find_similar_offers_saved_workflow(tmp_path):
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    (workflows_dir / "weather_to_email.json").write_text(workflow.model_dump_json())
+
+    match = WorkflowCache(path=str(tmp_path / "cache.json")).find_similar(
+        "Email me the weather forecast every morning", workflows_dir=str(workflows_dir)
+    )
+    assert match is not None and match[2].name == "weather_to_email"
+
+
+def test_entries_written_by_another_process_survive(tmp_path):
+    first = WorkflowCache(path=str(tmp_path / "cache.json"))
+    second = WorkflowCache(path=str(tmp_path / "cache.json"))
+    first.put("first prompt", workflow)
+    second.put("second prompt", workflow)
+
+    reloaded = WorkflowCache(path=str(tmp_path / "cache.json"))
+    assert reloaded.get("first prompt") is not None and reloaded.get("second prompt") is not None
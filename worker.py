@@ -0,0 +1,202 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+
+from core.plan import load_plan_bytes, render
+from core.queue import SqliteQueue, QUEUE_PATH, DEFAULT_LEASE_SECONDS
+from core.state import SharedStateStore, NO_CHANGES
+from runner import STEP_HANDLERS, flush_latencies, run_plan, run_plan_step
+
+POLL_INTERVAL = 1.0
+
+
+def enqueue_workflow(queue: SqliteQueue, workflow_path: str, distribute_steps: bool = False) -> str:
+    """
+    Queue a run of a workflow file and return its run id. The workflow JSON travels
+    with the job, so any worker can run it without access to the file.
+    With `distribute_steps`, each step becomes its own job. Steps still run in order
+    (each waits for every earlier step) unless they set `parallel`, in which case
+    they start as soon as the steps they reference have results.
+    """
+    with open(workflow_path, "rb") as f:
+        raw = f.read()
+    plan = load_plan_bytes(raw, STEP_HANDLERS)
+    run_id = uuid.uuid4().hex
+    payload = {"run_id": run_id, "workflow": raw.decode("utf-8")}
+
+    if not distribute_steps:
+        queue.create_run(run_id, plan.name, "workflow")
+        queue.enqueue("workflow", payload, job_id=f"{run_id}:workflow")
+        return run_id
+
+    queue.create_run(run_id, plan.name, "steps")
+    for step in plan.steps:
+        if not step_dependencies(step):
+            queue.enqueue("step", {**payload, "step_index": step.index}, job_id=f"{run_id}:{step.index}")
+    return run_id
+
+
+def step_dependencies(step) -> frozenset:
+    """Steps that need results before `step` may start in step mode."""
+    if step.parallel:
+        return step.dependencies
+    return frozenset(range(step.index))
+
+
+class Worker:
+    """
+    Claims jobs from the shared queue and runs them. A background heartbeat keeps
+    the lease alive while a job runs; if this process dies, the lease expires and
+    another worker picks the job up (at-least-once, so steps should be idempotent).
+    """
+
+    def __init__(self, queue: SqliteQueue, worker_id: str = None, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+
+    def run_forever(self, exit_when_idle: bool = False):
+        print(f"👷 Worker {self.worker_id} started")
+        while True:
+            job = self.queue.claim(self.worker_id, self.lease_seconds)
+            if job is None:
+                if exit_when_idle:
+                    return
+                time.sleep(POLL_INTERVAL)
+                continue
+            self.process(job)
+
+    def process(self, job):
+        print(f"\n📥 Claimed {job.kind} job {job.id} (attempt {job.attempts})")
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job.id, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            if job.kind == "workflow":
+                self.run_workflow_job(job.payload)
+            elif job.kind == "step":
+                self.run_step_job(job.payload)
+            else:
+                raise ValueError(f"Unknown job kind '{job.kind}'")
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            self.queue.fail(job.id, self.worker_id, str(e))
+        else:
+            self.queue.complete(job.id, self.worker_id)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+    def _heartbeat(self, job_id: str, stop: threading.Event):
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                print(f"⚠️ Lost lease on job {job_id}; another worker may run it too.")
+                return
+
+    def run_workflow_job(self, payload: dict):
+        run_id = payload["run_id"]
+        plan = load_plan_bytes(payload["workflow"].encode("utf-8"), STEP_HANDLERS)
+        self.queue.set_run_status(run_id, "running")
+        ok = run_plan(plan, on_output=lambda i, output, status: self.queue.put(run_id, i, output, status),
+                      state=SharedStateStore(plan.name, self.queue))
+        self.queue.set_run_status(run_id, "done" if ok else "failed")
+
+    def run_step_job(self, payload: dict):
+        run_id = payload["run_id"]
+        index = payload["step_index"]
+        run = self.queue.get_run(run_id)
+        if run["status"] in ("done", "failed") or index in run["steps"]:
+            return  # duplicate delivery, or the run already finished
+
+        plan = load_plan_bytes(payload["workflow"].encode("utf-8"), STEP_HANDLERS)
+        self.queue.set_run_status(run_id, "running")
+        results = run["steps"]
+        step = plan.steps[index]
+        state = SharedStateStore(plan.name, self.queue)
+        context = {
+            "trigger": render(plan.trigger_params, {}),
+            "steps": {i: {"output": r["output"]} for i, r in results.items()},
+            "state": state
+        }
+        skipped = {i for i, r in results.items() if r["status"] == "skipped"}
+
+        latencies = []
+        status, output = run_plan_step(index, step, context, skipped, latencies=latencies)
+        flush_latencies(latencies)
+        # Cursor updates travel with the result and are saved when the run finishes
+        self.queue.put(run_id, index, output, status, state=state.updates)
+
+        if status == "failed":
+            self.queue.set_run_status(run_id, "failed", f"step {index} failed")
+            return
+        if output == NO_CHANGES:
+            print(f"⏭️ Step {index} found nothing new — finishing run {run_id}.")
+            self._finish(run_id, plan, self.queue.all(run_id))
+            return
+        print(f"✅ Step {index} output: {output}")
+        self._advance(run_id, plan, payload)
+
+    def _advance(self, run_id: str, plan, payload: dict):
+        results = self.queue.all(run_id)
+        if any(r["status"] == "failed" or r["output"] == NO_CHANGES for r in results.values()):
+            return  # the run already ended; don't start anything else
+        if len(results) == len(plan.steps):
+            self._finish(run_id, plan, results)
+            return
+        for step in plan.steps:
+            if step.index not in results and step_dependencies(step).issubset(results):
+                # Deterministic job ids make this safe when several workers advance at once
+                self.queue.enqueue("step", {**payload, "step_index": step.index}, job_id=f"{run_id}:{step.index}")
+
+
+    def _finish(self, run_id: str, plan, results: dict):
+        # Same rule as the local runner: only advance cursors when nothing was skipped
+        if any(r["status"] == "skipped" for r in results.values()):
+            print("⚠️ Some steps were skipped — keeping previous cursors for the next run.")
+        else:
+            state = SharedStateStore(plan.name, self.queue)
+            for index in sorted(results):
+                state.apply(results[index]["state"])
+            state.save()
+        self.queue.set_run_status(run_id, "done")
+        print(f"🎉 Run {run_id} complete.")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    queue_path = QUEUE_PATH
+    if "--queue" in args:
+        idx = args.index("--queue")
+        queue_path = args[idx + 1]
+        del args[idx:idx + 2]
+
+    if not args:
+        print("Usage:\n"
+              "  python worker.py enqueue workflows/your_workflow.json [--steps] [--queue PATH]\n"
+              "  python worker.py run [--concurrency N] [--exit-when-idle] [--queue PATH]\n"
+              "  python worker.py status RUN_ID [--queue PATH]")
+        sys.exit(1)
+
+    queue = SqliteQueue(queue_path)
+    command = args[0]
+
+    if command == "enqueue":
+        run_id = enqueue_workflow(queue, args[1], distribute_steps="--steps" in args)
+        print(f"📤 Queued run {run_id}")
+    elif command == "run":
+        concurrency = int(args[args.index("--concurrency") + 1]) if "--concurrency" in args else 1
+        exit_when_idle = "--exit-when-idle" in args
+        workers = [threading.Thread(target=Worker(queue).run_forever, args=(exit_when_idle,)) for _ in range(concurrency)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    elif command == "status":
+        print(json.dumps(queue.get_run(args[1]), indent=2, default=str))
+    else:
+        print(f"❌ Unknown command: {command}")
+        sys.exit(1)